@@ -0,0 +1,147 @@
+import os
+import pickle
+import random
+import logging
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele os sorteios em lote usam listas
+    np = None
+
+# Versão do formato do arquivo de tabelas de alias persistido ao lado do banco
+VERSAO_ARQUIVO_ALIAS = 1
+
+# Classe com uma tabela de alias (método de Walker/Vose) para sorteios ponderados em O(1)
+class TabelaAlias:
+    """Distribuição discreta sobre os índices 0..n-1 com sorteio em tempo constante.
+
+    Cada sorteio usa um único número uniforme: a parte inteira escolhe a coluna e a parte
+    fracionária decide entre a própria coluna e o seu alias. Quando todos os pesos são
+    iguais (`uniforme`), o sorteio vira um simples índice uniforme.
+    """
+
+    __slots__ = ("probabilidades", "aliases", "tamanho", "uniforme", "_probabilidades_np", "_aliases_np")
+
+    def __init__(self, probabilidades, aliases, uniforme=False):
+        self.probabilidades = probabilidades
+        self.aliases = aliases
+        self.tamanho = len(probabilidades)
+        self.uniforme = uniforme
+        self._probabilidades_np = None
+        self._aliases_np = None
+
+    @classmethod
+    def construir(cls, pesos):
+        """Constrói a tabela em O(n) a partir de pesos não negativos (método de Vose)."""
+        pesos = list(pesos)
+        n = len(pesos)
+        total = float(sum(pesos))
+        if n == 0:
+            return cls(array("d"), array("I"), uniforme=True)
+        if total <= 0 or min(pesos) == max(pesos):
+            return cls(array("d", [1.0]) * n, array("I", range(n)), uniforme=True)
+
+        escalados = [peso * n / total for peso in pesos]
+        probabilidades = array("d", [1.0]) * n
+        aliases = array("I", range(n))
+        pequenos = [i for i, p in enumerate(escalados) if p < 1.0]
+        grandes = [i for i, p in enumerate(escalados) if p >= 1.0]
+        while pequenos and grandes:
+            menor, maior = pequenos.pop(), grandes.pop()
+            probabilidades[menor] = escalados[menor]
+            aliases[menor] = maior
+            escalados[maior] = escalados[maior] + escalados[menor] - 1.0
+            (pequenos if escalados[maior] < 1.0 else grandes).append(maior)
+        # O que sobrar (por arredondamento) fica com probabilidade 1 e alias para si mesmo
+        return cls(probabilidades, aliases)
+
+    def sortear(self, rng=None):
+        """Sorteia um índice."""
+        rng = rng if rng is not None else random
+        u = rng.random() * self.tamanho
+        i = int(u)
+        if self.uniforme or u - i < self.probabilidades[i]:
+            return i
+        return self.aliases[i]
+
+    def sortear_lote(self, n, rng=None):
+        """Sorteia n índices de uma vez e retorna uma lista de ints."""
+        rng = rng if rng is not None else random
+        if self.uniforme:
+            return rng.choices(range(self.tamanho), k=n)
+        if np is not None:
+            return self._sortear_lote_numpy(n, np.random.default_rng(rng.getrandbits(64))).tolist()
+
+        probabilidades, aliases, tamanho = self.probabilidades, self.aliases, self.tamanho
+        aleatorio = rng.random
+        uniformes = [aleatorio() * tamanho for _ in range(n)]
+        return [i if u - i < probabilidades[i] else aliases[i] for u in uniformes for i in (int(u),)]
+
+    def _sortear_lote_numpy(self, n, gerador):
+        return self.indices(gerador.random(n))
+
+    def indices(self, uniformes):
+        """Converte números uniformes em [0, 1) nos índices sorteados (array NumPy ou lista, conforme a entrada).
+
+        É o sorteio sem estado: o mesmo uniforme sempre dá o mesmo índice (usado por indexado.py).
+        """
+        if np is not None and isinstance(uniformes, np.ndarray):
+            u = uniformes * self.tamanho
+            colunas = u.astype(np.int64)
+            if self.uniforme:
+                return colunas
+            if self._probabilidades_np is None:
+                self._probabilidades_np = np.frombuffer(self.probabilidades, dtype=np.float64)
+                self._aliases_np = np.frombuffer(self.aliases, dtype=np.uint32)
+            return np.where(u - colunas < self._probabilidades_np[colunas], colunas, self._aliases_np[colunas])
+
+        tamanho = self.tamanho
+        if self.uniforme:
+            return [int(u * tamanho) for u in uniformes]
+        probabilidades, aliases = self.probabilidades, self.aliases
+        return [i if u - i < probabilidades[i] else aliases[i] for u in (u * tamanho for u in uniformes) for i in (int(u),)]
+
+    def __getstate__(self):
+        return (self.probabilidades, self.aliases, self.uniforme)
+
+    def __setstate__(self, estado):
+        self.__init__(*estado)
+
+# Função para obter o caminho do arquivo de tabelas de alias de um banco
+def caminho_arquivo_alias(db_path):
+    """Retorna o caminho do arquivo de tabelas de alias ao lado do banco (ex.: nomes.alias)."""
+    return os.path.splitext(db_path)[0] + ".alias"
+
+# Função para carregar as tabelas de alias persistidas, se ainda valerem para o banco
+def carregar_tabelas(db_path, assinatura):
+    """Retorna o dicionário de tabelas salvo para esta assinatura do banco, ou None se ausente/desatualizado."""
+    caminho = caminho_arquivo_alias(db_path)
+    try:
+        with open(caminho, "rb") as arquivo:
+            conteudo = pickle.load(arquivo)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        logging.warning(f"Tabelas de alias ignoradas ({caminho}): {e}")
+        return None
+    if conteudo.get("versao") != VERSAO_ARQUIVO_ALIAS or conteudo.get("assinatura") != assinatura:
+        return None
+    return conteudo["tabelas"]
+
+# Função para persistir as tabelas de alias ao lado do banco
+def salvar_tabelas(db_path, assinatura, tabelas):
+    """Grava as tabelas para reuso nas próximas execuções; falhas (ex.: pasta somente leitura) só geram aviso."""
+    caminho = caminho_arquivo_alias(db_path)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temporario, "wb") as arquivo:
+            pickle.dump({"versao": VERSAO_ARQUIVO_ALIAS, "assinatura": assinatura, "tabelas": tabelas},
+                        arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        logging.warning(f"Não foi possível salvar as tabelas de alias em {caminho}: {e}")
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
@@ -0,0 +1,134 @@
+import random
+from array import array
+
+import dados
+from dados import COLUNAS_USUARIO
+
+# Registros sorteados (e acrescentados) por bloco em LoteCompacto.gerar
+TAMANHO_BLOCO_PADRAO = 100000
+# Campos guardados, na ordem das chaves de dados.sortear_usuarios
+CAMPOS = ("indices_nomes", "indices_sobrenomes", "indices_adjetivos", "sequencias", "indices_ddds", "numeros", "bases_cpf")
+
+# Função para escolher o menor tipo de array que guarda índices de um conjunto
+def tipo_indice(tamanho):
+    """Retorna o typecode ('B', 'H' ou 'I') de índices em range(tamanho)."""
+    if tamanho <= 1 << 8:
+        return "B"
+    if tamanho <= 1 << 16:
+        return "H"
+    return "I"
+
+# Função para acrescentar valores (lista ou array NumPy) a um array
+def _estender(coluna, valores):
+    if isinstance(valores, (list, tuple, array)):
+        coluna.extend(valores)
+    else:
+        coluna.frombytes(valores.astype(coluna.typecode).tobytes())
+
+# Classe que guarda um lote grande de usuários codificado em inteiros
+class LoteCompacto:
+    """Lote de usuários guardado como os sorteios de dados.sortear_usuarios, sem as strings.
+
+    Nomes, sobrenomes, adjetivos e DDDs ficam como índices no vocabulário (1, 2 ou 4 bytes,
+    conforme o tamanho de cada conjunto), o sufixo do login em 2 bytes e o número do celular
+    e a base do CPF em 4 bytes cada: cerca de 16 bytes por usuário em vez das cinco strings.
+    As strings só são montadas (por dados.montar_usuarios) ao ler uma linha, uma fatia ou
+    os lotes para exportar, com os mesmos valores de dados.gerar_usuarios.
+
+    Os índices só valem para o vocabulário em que foram sorteados: o lote guarda o seu.
+    Expõe __len__ e linha(i) (nas `colunas` informadas), como as fontes da TabelaVirtual.
+    """
+
+    def __init__(self, genero=None, vocabulario=None, colunas=COLUNAS_USUARIO, tamanho_pagina=256):
+        self.genero = genero
+        self.vocabulario = vocabulario if vocabulario is not None else dados.obter_vocabulario()
+        self.colunas = colunas
+        self.tamanho_pagina = tamanho_pagina
+        self.total = 0
+        self._campos = None
+        self._pagina = None
+        self._linhas = ()
+
+    def _criar_campos(self, sorteios):
+        vocabulario = self.vocabulario
+        tamanhos = {
+            "indices_nomes": lambda: len(vocabulario.nomes(self.genero)),
+            "indices_sobrenomes": lambda: len(vocabulario.sobrenomes),
+            "indices_adjetivos": lambda: len(vocabulario.adjetivos),
+            "indices_ddds": lambda: len(vocabulario.ddds),
+        }
+        tipos = {"sequencias": "H", "numeros": "I", "bases_cpf": "I"}
+        # Campos None (conjunto ausente do vocabulário) continuam None: montar_usuarios usa os padrões
+        return {
+            campo: array(tipos[campo] if campo in tipos else tipo_indice(tamanhos[campo]()))
+            if sorteios[campo] is not None else None
+            for campo in CAMPOS
+        }
+
+    def acrescentar(self, sorteios):
+        """Acrescenta o resultado de dados.sortear_usuarios (ou indexado.sortear_intervalo) ao lote."""
+        if sorteios["genero"] != self.genero:
+            raise ValueError(f"Sorteios do gênero {sorteios['genero']!r} num lote do gênero {self.genero!r}.")
+        if self._campos is None:
+            self._campos = self._criar_campos(sorteios)
+        for campo, coluna in self._campos.items():
+            if coluna is not None:
+                _estender(coluna, sorteios[campo])
+        # O total só cresce depois de todas as colunas: leitores em outra thread nunca veem linha incompleta
+        self.total += sorteios["n"]
+
+    def gerar(self, n, rng=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+        """Sorteia e acrescenta n usuários em blocos de `tamanho_bloco`; chama progresso(total) após cada bloco.
+
+        Com o mesmo `rng` semeado e o mesmo bloco, são os usuários de dados.gerar_usuarios chamado bloco a bloco.
+        """
+        rng = rng if rng is not None else random
+        for posicao in range(0, n, tamanho_bloco):
+            self.acrescentar(dados.sortear_usuarios(min(tamanho_bloco, n - posicao), self.genero, rng, self.vocabulario))
+            if progresso is not None:
+                progresso(self.total)
+        return self
+
+    def __len__(self):
+        return self.total
+
+    def sorteios(self, inicio, fim):
+        """Retorna os sorteios dos registros [inicio, fim), no formato de dados.sortear_usuarios."""
+        inicio, fim = max(0, inicio), min(fim, self.total)
+        fim = max(inicio, fim)
+        sorteios = {campo: None for campo in CAMPOS}
+        if self._campos is not None:
+            sorteios.update((campo, coluna[inicio:fim]) for campo, coluna in self._campos.items() if coluna is not None)
+        sorteios["n"], sorteios["genero"] = fim - inicio, self.genero
+        return sorteios
+
+    def fatia(self, inicio, fim):
+        """Monta as colunas (como dados.gerar_usuarios) dos registros [inicio, fim)."""
+        return dados.montar_usuarios(self.sorteios(inicio, fim), self.vocabulario)
+
+    def linha(self, indice):
+        pagina = indice // self.tamanho_pagina
+        posicao = indice - pagina * self.tamanho_pagina
+        # Uma página lida enquanto o lote crescia pode estar incompleta: monta de novo
+        if pagina != self._pagina or posicao >= len(self._linhas):
+            inicio = pagina * self.tamanho_pagina
+            lote = self.fatia(inicio, inicio + self.tamanho_pagina)
+            self._linhas = list(zip(*(lote[coluna] for coluna in self.colunas)))
+            self._pagina = pagina
+        return self._linhas[posicao]
+
+    def lotes(self, tamanho_lote=10000):
+        """Gera o lote inteiro em lotes de colunas (para exportar)."""
+        for posicao in range(0, self.total, tamanho_lote):
+            yield self.fatia(posicao, posicao + tamanho_lote)
+
+    def tamanho_bytes(self):
+        """Bytes ocupados pelos arrays (sem o vocabulário, que é compartilhado)."""
+        if self._campos is None:
+            return 0
+        return sum(coluna.itemsize * len(coluna) for coluna in self._campos.values() if coluna is not None)
+
+    def bytes_por_usuario(self):
+        if self._campos is None:
+            return 0
+        return sum(coluna.itemsize for coluna in self._campos.values() if coluna is not None)
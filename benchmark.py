@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+
+import dados
+import exportar
+import setup_db
+
+# Versão do formato do arquivo de resultados
+VERSAO_RESULTADOS = 1
+# Tamanhos de vocabulário medidos por padrão (40 = banco criado pelo setup_db, sem importação)
+TAMANHOS_PADRAO = (40, 10000, 1000000)
+# Queda máxima de registros/s aceita em relação à base (0.2 = 20%)
+LIMITE_PADRAO = 0.2
+# Sílabas usadas para montar nomes sintéticos únicos
+SILABAS = tuple(c + v for c in "bcdfglmnprstvz" for v in "aeiou")
+
+# Função para montar um nome sintético único a partir de um índice
+def nome_sintetico(indice, minimo_silabas=3):
+    """Escreve `indice` na base len(SILABAS), uma sílaba por dígito (sílabas de 2 letras: nomes distintos para índices distintos)."""
+    silabas = []
+    while indice or len(silabas) < minimo_silabas:
+        indice, resto = divmod(indice, len(SILABAS))
+        silabas.append(SILABAS[resto])
+    return "".join(reversed(silabas)).capitalize()
+
+# Função para gravar um CSV de nomes sintéticos com frequências no formato de Zipf
+def _escrever_csv_sintetico(caminho, tamanho, cabecalho, linha):
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        arquivo.write(",".join(cabecalho) + "\n")
+        for i in range(tamanho):
+            arquivo.write(",".join(linha(i, max(1, 1000000 // (i + 1)))) + "\n")
+
+# Função para criar (ou reaproveitar) um banco de nomes sintético
+def criar_fixture(tamanho, pasta):
+    """Retorna um nomes.db criado pelo setup_db com `tamanho` primeiros nomes e `tamanho` sobrenomes importados.
+
+    Com tamanho <= 40 o banco fica só com os nomes completos padrão do setup_db. Os bancos
+    ficam em `pasta` e são reaproveitados nas próximas execuções.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"nomes_{tamanho}.db")
+    if os.path.exists(caminho):
+        return caminho
+
+    temporario = os.path.join(pasta, f"nomes_{tamanho}.{os.getpid()}.tmp")
+    with contextlib.redirect_stdout(sys.stderr):
+        setup_db.criar_banco_de_dados(temporario)
+        if tamanho > 40:
+            arquivo_nomes = temporario + ".nomes.csv"
+            arquivo_sobrenomes = temporario + ".sobrenomes.csv"
+            try:
+                _escrever_csv_sintetico(arquivo_nomes, tamanho, ("nome", "genero", "frequencia"),
+                                        lambda i, f: (nome_sintetico(i), "MF"[i % 2], str(f)))
+                _escrever_csv_sintetico(arquivo_sobrenomes, tamanho, ("sobrenome", "frequencia"),
+                                        lambda i, f: (nome_sintetico(i, minimo_silabas=4), str(f)))
+                setup_db.importar_primeiros_nomes(arquivo_nomes, temporario)
+                setup_db.importar_sobrenomes(arquivo_sobrenomes, temporario)
+            finally:
+                for arquivo in (arquivo_nomes, arquivo_sobrenomes):
+                    if os.path.exists(arquivo):
+                        os.remove(arquivo)
+    os.replace(temporario, caminho)
+    return caminho
+
+# Função para calcular um percentil de uma lista já ordenada
+def percentil(valores, fracao):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(fracao * len(valores)))]
+
+# Função para medir um caso do benchmark
+def medir(funcao, repeticoes, preparar=None, aquecimento=3):
+    """Chama `funcao` (que retorna quantos registros produziu) `repeticoes` vezes.
+
+    Retorna registros/s (pelo tempo total das chamadas) e os percentis 50 e 99 da
+    latência por registro de cada chamada, em microssegundos. `preparar` roda antes de
+    cada chamada, fora da medida.
+    """
+    for _ in range(aquecimento):
+        if preparar is not None:
+            preparar()
+        funcao()
+
+    latencias = []
+    registros = 0
+    duracao = 0
+    relogio = time.perf_counter_ns
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = relogio()
+        n = funcao()
+        decorrido = relogio() - inicio
+        duracao += decorrido
+        registros += n
+        latencias.append(decorrido / n / 1000)
+    latencias.sort()
+    return {
+        "registros": registros,
+        "registros_por_segundo": registros / (duracao / 1e9) if duracao else 0.0,
+        "p50_us": percentil(latencias, 0.50),
+        "p99_us": percentil(latencias, 0.99),
+    }
+
+# Função para montar os casos medidos: nome -> (função, repetições, preparar)
+def _casos(registros, tamanho_lote, pasta):
+    def um_nome():
+        dados.gerar_nome()
+        return 1
+
+    def um_login():
+        dados.gerar_login("Hugo Santana")
+        return 1
+
+    def um_cpf():
+        dados.gerar_cpf_valido()
+        return 1
+
+    def um_celular():
+        dados.gerar_numero_celular_completo()
+        return 1
+
+    def um_usuario():
+        # Montagem registro a registro, como a interface fazia antes do gerar_usuarios
+        nome = dados.gerar_nome()
+        dados.gerar_login(nome)
+        dados.gerar_cpf_valido()
+        dados.gerar_numero_celular_completo()
+        return 1
+
+    def um_lote():
+        return len(dados.gerar_usuarios(tamanho_lote)["nome"])
+
+    lote = dados.gerar_usuarios(tamanho_lote, rng=random.Random(0))
+    destino_sqlite = os.path.join(pasta, "benchmark_exportar.db")
+
+    def remover_sqlite():
+        if os.path.exists(destino_sqlite):
+            os.remove(destino_sqlite)
+
+    lotes = max(1, registros // tamanho_lote)
+    return {
+        "gerar_nome": (um_nome, registros, None),
+        "gerar_login": (um_login, registros, None),
+        "gerar_cpf_valido": (um_cpf, registros, None),
+        "gerar_numero_celular_completo": (um_celular, registros, None),
+        "usuario_por_registro": (um_usuario, registros, None),
+        "gerar_usuarios": (um_lote, lotes, None),
+        "exportar_csv": (lambda: exportar.exportar_csv([lote], os.devnull), lotes, None),
+        "exportar_jsonl": (lambda: exportar.exportar_jsonl([lote], os.devnull), lotes, None),
+        "exportar_sqlite": (lambda: exportar.exportar_sqlite([lote], destino_sqlite), lotes, remover_sqlite),
+    }
+
+# Função para executar o benchmark em todos os tamanhos de vocabulário
+def executar(tamanhos=TAMANHOS_PADRAO, registros=50000, tamanho_lote=1000, pasta=None, saida=sys.stdout):
+    """Mede cada caso para cada tamanho de vocabulário e retorna o dicionário de resultados (formato JSON)."""
+    pasta = pasta or os.path.join(tempfile.gettempdir(), "gerador_destiny_benchmark")
+    resultados = {}
+    try:
+        for tamanho in tamanhos:
+            dados.definir_caminho_banco(criar_fixture(tamanho, pasta))
+            inicio = time.perf_counter()
+            dados.obter_vocabulario()
+            carga = time.perf_counter() - inicio
+            print(f"vocabulário {tamanho}: carregado em {carga:.3f}s", file=saida)
+
+            medidas = {"carga_vocabulario_s": carga, "casos": {}}
+            for caso, (funcao, repeticoes, preparar) in _casos(registros, tamanho_lote, pasta).items():
+                medida = medir(funcao, repeticoes, preparar)
+                medidas["casos"][caso] = medida
+                print(f"  {caso:<30} {medida['registros_por_segundo']:>14,.0f} reg/s"
+                      f"  p50 {medida['p50_us']:>9.2f} µs  p99 {medida['p99_us']:>9.2f} µs", file=saida)
+            resultados[str(tamanho)] = medidas
+    finally:
+        dados.definir_caminho_banco(None)
+
+    return {
+        "versao": VERSAO_RESULTADOS,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "registros": registros,
+        "tamanho_lote": tamanho_lote,
+        "resultados": resultados,
+    }
+
+# Função para comparar uma execução com uma base salva
+def comparar(atual, base, limite=LIMITE_PADRAO):
+    """Retorna [(tamanho, caso, reg/s atual, reg/s base)] dos casos que caíram mais que `limite` em relação à base.
+
+    Só entram na comparação os tamanhos e casos presentes nas duas execuções.
+    """
+    regressoes = []
+    for tamanho, medidas in atual["resultados"].items():
+        casos_base = base.get("resultados", {}).get(tamanho, {}).get("casos", {})
+        for caso, medida in medidas["casos"].items():
+            if caso not in casos_base:
+                continue
+            referencia = casos_base[caso]["registros_por_segundo"]
+            if medida["registros_por_segundo"] < referencia * (1 - limite):
+                regressoes.append((tamanho, caso, medida["registros_por_segundo"], referencia))
+    return regressoes
+
+# Função principal do benchmark
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos geradores de dados.py e da exportação.")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS_PADRAO)),
+                        help="tamanhos de vocabulário separados por vírgula (padrão: %(default)s)")
+    parser.add_argument("--registros", type=int, default=50000, help="registros medidos por caso (padrão: %(default)s)")
+    parser.add_argument("--lote", type=int, default=1000, help="tamanho do lote dos casos em lote (padrão: %(default)s)")
+    parser.add_argument("--fixtures", default=None, help="pasta dos bancos sintéticos (padrão: pasta temporária)")
+    parser.add_argument("--saida", default=None, help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--base", default=None, help="resultados JSON salvos para comparação")
+    parser.add_argument("--limite", type=float, default=LIMITE_PADRAO,
+                        help="queda máxima de registros/s aceita em relação à base (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    tamanhos = [int(tamanho) for tamanho in args.tamanhos.split(",") if tamanho.strip()]
+    if args.registros <= 0 or args.lote <= 0:
+        logging.error("--registros e --lote devem ser positivos.")
+        return 2
+    logging.getLogger().setLevel(logging.WARNING)
+
+    resultados = executar(tamanhos, args.registros, args.lote, args.fixtures)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(resultados, base, args.limite)
+        for tamanho, caso, atual, referencia in regressoes:
+            print(f"REGRESSÃO vocabulário {tamanho} {caso}: {atual:,.0f} reg/s (base {referencia:,.0f})", file=sys.stderr)
+        if regressoes:
+            return 1
+        print(f"Sem regressões acima de {args.limite:.0%} em relação a {args.base}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
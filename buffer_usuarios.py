@@ -0,0 +1,79 @@
+import queue
+import logging
+import threading
+
+import esquema
+
+# Gêneros atendidos pela interface (N = qualquer)
+GENEROS = ("M", "F", "N")
+# Usuários prontos mantidos por gênero
+CAPACIDADE_PADRAO = 64
+
+# Classe que mantém usuários prontos para a interface
+class BufferUsuarios:
+    """Filas limitadas de usuários prontos por gênero, reabastecidas por uma thread em segundo plano.
+
+    A thread produtora nunca toca no Tk: ela só gera lotes com o plano do esquema "padrao" e enche
+    as filas, começando pelo gênero ativo. obter() apenas retira um registro pronto
+    (tupla na ordem de COLUNAS_USUARIO), ou None se ainda não houver, e acorda a produtora.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, generos=GENEROS):
+        self.filas = {genero: queue.Queue(capacidade) for genero in generos}
+        self.genero_ativo = generos[0]
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._produzir, name="buffer-usuarios", daemon=True)
+
+    def iniciar(self):
+        """Inicia a thread produtora (o vocabulário é carregado por ela, fora da thread do Tk)."""
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+
+    def priorizar(self, genero):
+        """Define o gênero abastecido primeiro; as demais filas continuam sendo mantidas cheias."""
+        if genero in self.filas:
+            self.genero_ativo = genero
+            self._acordar.set()
+
+    def obter(self, genero):
+        """Retira um usuário pronto do gênero sem esperar; retorna None se a fila ainda estiver vazia.
+
+        Nunca gera na thread de quem chama (a do Tk): com a fila vazia, só acorda a produtora.
+        """
+        try:
+            registro = self.filas[genero].get_nowait()
+        except queue.Empty:
+            registro = None
+        self._acordar.set()
+        return registro
+
+    def _gerar(self, n, genero):
+        plano = esquema.obter_plano("padrao", genero)
+        lote = plano.gerar(n)
+        return list(zip(*(lote[coluna] for coluna in plano.colunas)))
+
+    def _produzir(self):
+        while not self._parar.is_set():
+            self._acordar.clear()
+            ordem = [self.genero_ativo] + [genero for genero in self.filas if genero != self.genero_ativo]
+            for genero in ordem:
+                fila = self.filas[genero]
+                faltam = fila.maxsize - fila.qsize()
+                if faltam <= 0:
+                    continue
+                try:
+                    registros = self._gerar(faltam, genero)
+                except Exception as e:
+                    logging.error(f"Erro ao abastecer o buffer de usuários: {e}")
+                    break
+                for registro in registros:
+                    try:
+                        fila.put_nowait(registro)
+                    except queue.Full:
+                        break
+            self._acordar.wait()
@@ -0,0 +1,154 @@
+import argparse
+import logging
+import os
+import sys
+import sqlite3
+
+import esquema
+import esteira
+import instrumentacao
+from indexado import gerar_lotes_indexados
+from exportar import FORMATOS, contar_usuarios_sqlite, exportar, ler_cpfs_logins_sqlite
+from paralelo import gerar_lotes_paralelo
+from unicidade import IndiceUnicidade, aplicar_unicidade
+
+# Função para montar o parser de argumentos da linha de comando
+def criar_parser():
+    """Cria o parser da interface de linha de comando (sem interface gráfica)."""
+    parser = argparse.ArgumentParser(
+        prog="gerador-destiny",
+        description="Gera usuários sem interface gráfica e exporta em CSV, JSONL ou SQLite.",
+    )
+    parser.add_argument("-n", "--count", type=int, default=10, help="quantidade de usuários (padrão: 10)")
+    parser.add_argument("-g", "--genero", choices=["M", "F", "N"], default="N", help="gênero dos nomes (padrão: N)")
+    parser.add_argument("-f", "--formato", choices=FORMATOS, default="csv", help="formato de saída (padrão: csv)")
+    parser.add_argument("-o", "--saida", default="-", help="arquivo de saída; '-' para a saída padrão")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="usuários gerados por lote (padrão: 10000)")
+    parser.add_argument("--seed", type=int, default=None, help="semente mestre; com o mesmo --chunk-size a saída é reprodutível")
+    parser.add_argument("--unique", action="store_true", help="garante CPFs e logins sem repetição na execução")
+    parser.add_argument("--cpf-index", default=None, help="arquivo do bitset de CPFs (com --unique), persistido entre execuções")
+    parser.add_argument("--perfil", choices=["rapido", "seguro"], default="rapido",
+                        help="PRAGMAs da carga SQLite: rapido (sem journal) ou seguro (WAL); padrão: rapido")
+    parser.add_argument("--resume", action="store_true",
+                        help="SQLite: mantém os usuários já gravados e gera só os que faltam para chegar a --count "
+                             "(igual a uma geração completa se a carga anterior usou o mesmo --count, "
+                             "ou um múltiplo de --chunk-size; com --indexado, sempre)")
+    parser.add_argument("--workers", type=int, default=1, help="processos de geração (0 = um por núcleo; padrão: 1)")
+    parser.add_argument("--compressao", choices=list(esteira.COMPRESSOES), default=None,
+                        help="comprime a saída CSV/JSONL (padrão: pela extensão de --saida: .gz, .bz2 ou .xz)")
+    parser.add_argument("--processos-exportacao", type=int, default=1,
+                        help="processos que codificam e comprimem os lotes em paralelo (0 = um por núcleo; padrão: 1)")
+    parser.add_argument("--esquema", default=None, metavar="NOME|ARQUIVO",
+                        help=f"campos gerados: esquema embutido ({', '.join(esquema.ESQUEMAS)}) ou arquivo JSON/YAML")
+    parser.add_argument("--indexado", action="store_true",
+                        help="cada usuário é calculado pela posição (com --seed, o usuário i não depende do --chunk-size)")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help=f"mede o tempo de cada etapa e mostra um resumo no fim (ou {instrumentacao.VARIAVEL_AMBIENTE}=1)")
+    parser.add_argument("--snapshots", default=None, help="com a instrumentação, acrescenta retratos JSON Lines a este arquivo")
+    parser.add_argument("--intervalo-snapshots", type=float, default=5.0, help="segundos entre os retratos (padrão: 5)")
+    parser.add_argument("--capturar-lote", type=int, default=None, metavar="INDICE",
+                        help="captura cProfile do lote INDICE: geração (com --workers 1) e escrita no SQLite, "
+                             "ou geração e codificação em CSV/JSONL")
+    parser.add_argument("--captura-saida", default="captura_lote", help="prefixo dos arquivos da captura (padrão: captura_lote)")
+    parser.add_argument("--capturar-memoria", action="store_true", help="inclui as maiores alocações (tracemalloc) na captura")
+    return parser
+
+# Função principal da linha de comando
+def main(argv=None):
+    """Executa a geração sem interface gráfica e retorna o código de saída."""
+    args = criar_parser().parse_args(argv)
+    if args.count < 0 or args.chunk_size <= 0 or args.workers < 0 or args.processos_exportacao < 0:
+        logging.error("--count, --workers e --processos-exportacao não podem ser negativos e --chunk-size deve ser positivo.")
+        return 2
+
+    compressao = args.compressao or esteira.compressao_pela_extensao(args.saida)
+    if compressao is not None and args.formato not in esteira.FORMATOS_TEXTO:
+        logging.error("--compressao só é suportada com --formato csv ou jsonl.")
+        return 2
+
+    if args.indexado and args.workers != 1:
+        logging.error("--indexado gera no próprio processo; use --workers 1.")
+        return 2
+
+    plano = None
+    if args.esquema is not None:
+        if args.indexado or args.workers != 1:
+            logging.error("--esquema gera no próprio processo; não use com --indexado nem --workers.")
+            return 2
+        try:
+            plano = esquema.compilar(esquema.obter_esquema(args.esquema), args.genero)
+        except (OSError, ValueError) as e:
+            logging.error(f"Erro no esquema: {e}")
+            return 2
+        if args.unique and not {"cpf", "login"} <= set(plano.colunas):
+            logging.error("--unique requer as colunas cpf e login no esquema.")
+            return 2
+    elif not args.indexado and args.workers == 1:
+        # Sem --esquema, a geração sequencial usa o esquema embutido "padrao"
+        plano = esquema.obter_plano("padrao", args.genero)
+
+    if args.resume and args.formato != "sqlite":
+        logging.error("--resume só é suportado com --formato sqlite.")
+        return 2
+
+    opcoes = {"perfil": args.perfil} if args.formato == "sqlite" else {}
+    if plano is not None:
+        opcoes["colunas"] = plano.colunas
+    try:
+        inicio = contar_usuarios_sqlite(args.saida) if args.resume else 0
+    except ValueError as e:
+        logging.error(f"Erro ao retomar: {e}")
+        return 1
+    if inicio:
+        logging.info(f"Retomando a partir do usuário {inicio}.")
+
+    if plano is not None:
+        lotes = plano.gerar_lotes(args.count, args.chunk_size, args.seed, inicio)
+    elif args.indexado:
+        lotes = gerar_lotes_indexados(args.count, args.genero, args.chunk_size, args.seed, inicio)
+    else:
+        lotes = gerar_lotes_paralelo(args.count, args.genero, args.chunk_size, args.seed, args.workers or None, inicio)
+
+    if args.instrumentar or args.snapshots:
+        instrumentacao.ativar()
+    snapshots = instrumentacao.Snapshots(args.snapshots, args.intervalo_snapshots).iniciar() if args.snapshots else None
+
+    indice = IndiceUnicidade(args.count, args.cpf_index) if args.unique else None
+    if indice is not None:
+        if inicio:
+            try:
+                for pares in ler_cpfs_logins_sqlite(args.saida):
+                    indice.registrar_existentes(pares)
+            except ValueError as e:
+                logging.error(f"Erro ao retomar: {e}")
+                indice.fechar()
+                return 1
+        lotes = aplicar_unicidade(lotes, indice, args.seed, inicio // args.chunk_size)
+    if args.capturar_lote is not None:
+        lotes = instrumentacao.capturar_lote(lotes, args.capturar_lote, args.captura_saida, args.capturar_memoria)
+    try:
+        if args.formato in esteira.FORMATOS_TEXTO:
+            total = esteira.exportar_em_esteira(lotes, args.formato, args.saida, compressao=compressao,
+                                                processos=args.processos_exportacao, **opcoes)
+        else:
+            total = exportar(lotes, args.formato, args.saida, **opcoes)
+    except BrokenPipeError:
+        # A saída foi fechada antes do fim (ex.: "| head"); evita outro erro ao encerrar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logging.error(f"Erro na exportação: {e}")
+        return 1
+    finally:
+        if indice is not None:
+            indice.fechar()
+        if snapshots is not None:
+            snapshots.parar()
+        if instrumentacao.ATIVO:
+            print(instrumentacao.resumo(), file=sys.stderr)
+
+    logging.info(f"{total} usuários exportados ({args.formato}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
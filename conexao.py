@@ -0,0 +1,121 @@
+import os
+import time
+import sqlite3
+import threading
+import urllib.parse
+
+import instrumentacao
+
+# Tamanho da janela de mmap usada nas leituras (256 MB)
+MMAP_SIZE = 256 * 1024 * 1024
+# Quantidade de comandos preparados mantidos em cache por conexão
+COMANDOS_EM_CACHE = 64
+
+# Contadores globais do acesso ao banco (ver estatisticas())
+_estatisticas = {
+    "conexoes_abertas": 0,
+    "consultas": 0,
+    "tempo_sqlite": 0.0,
+    "inicializacoes_esquema": 0,
+    "verificacoes_arquivo": 0,
+}
+_estatisticas_lock = threading.Lock()
+
+# Conexões abertas por thread (e por processo, para não reutilizar conexões herdadas num fork)
+_local = threading.local()
+# Geração atual das conexões: incrementada quando o arquivo do banco muda
+_geracao = 0
+# Conexões herdadas de um fork: mantidas vivas para que o filho não as feche por cima do pai
+_conexoes_herdadas = []
+
+# Função para incrementar os contadores
+def registrar(**incrementos):
+    """Soma os valores informados aos contadores de estatisticas()."""
+    with _estatisticas_lock:
+        for chave, valor in incrementos.items():
+            _estatisticas[chave] += valor
+
+# Função para obter uma cópia dos contadores
+def estatisticas():
+    """Retorna os contadores: conexões abertas, consultas, tempo em SQLite e acessos ao disco."""
+    with _estatisticas_lock:
+        return dict(_estatisticas)
+
+# Função para zerar os contadores
+def zerar_estatisticas():
+    with _estatisticas_lock:
+        for chave in _estatisticas:
+            _estatisticas[chave] = type(_estatisticas[chave])()
+
+# Função para obter o dicionário de conexões da thread atual
+def _conexoes_da_thread():
+    if getattr(_local, "pid", None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.conexoes = {}
+    return _local.conexoes
+
+# Função executada no processo filho logo após um fork
+def _descartar_conexoes_herdadas():
+    """Impede que o filho reutilize (ou feche) as conexões SQLite do processo pai."""
+    conexoes = getattr(_local, "conexoes", None)
+    if conexoes:
+        _conexoes_herdadas.extend(conn for conn, _ in conexoes.values())
+    _local.pid = os.getpid()
+    _local.conexoes = {}
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_descartar_conexoes_herdadas)
+
+# Função para abrir uma conexão somente leitura ajustada para consultas
+def _abrir_somente_leitura(db_path):
+    # Caminho absoluto com "/" e escapes de URI (sem urllib.request, caro de importar na inicialização)
+    caminho = os.path.abspath(db_path).replace(os.sep, "/")
+    if not caminho.startswith("/"):
+        caminho = "/" + caminho
+    uri = f"file://{urllib.parse.quote(caminho, safe='/:')}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, cached_statements=COMANDOS_EM_CACHE)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+# Função para obter a conexão persistente da thread atual
+def obter_conexao(db_path):
+    """Retorna a conexão somente leitura da thread atual para o banco, abrindo-a na primeira vez."""
+    conexoes = _conexoes_da_thread()
+    conn, geracao = conexoes.get(db_path, (None, None))
+    if conn is not None and geracao != _geracao:
+        conn.close()
+        conn = None
+    if conn is None:
+        inicio = time.perf_counter()
+        conn = _abrir_somente_leitura(db_path)
+        conexoes[db_path] = (conn, _geracao)
+        duracao = time.perf_counter() - inicio
+        registrar(conexoes_abertas=1, tempo_sqlite=duracao)
+        if instrumentacao.ATIVO:
+            instrumentacao.registrar_tempo("banco.abrir", duracao)
+    return conn
+
+# Função para executar uma consulta na conexão persistente
+def consultar(db_path, sql, parametros=()):
+    """Executa a consulta (com comando preparado em cache) e retorna todas as linhas."""
+    conn = obter_conexao(db_path)
+    inicio = time.perf_counter()
+    try:
+        return conn.execute(sql, parametros).fetchall()
+    finally:
+        duracao = time.perf_counter() - inicio
+        registrar(consultas=1, tempo_sqlite=duracao)
+        if instrumentacao.ATIVO:
+            instrumentacao.registrar_tempo("banco.consulta", duracao)
+
+# Função para descartar as conexões abertas (ex.: quando o arquivo do banco foi substituído)
+def invalidar_conexoes():
+    """Fecha as conexões desta thread; as das demais threads são reabertas no próximo uso."""
+    global _geracao
+    with _estatisticas_lock:
+        _geracao += 1
+    conexoes = _conexoes_da_thread()
+    for conn, _ in conexoes.values():
+        conn.close()
+    conexoes.clear()
@@ -0,0 +1,154 @@
+import sys
+import time
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, dados.gerar_cpfs continua disponível
+    np = None
+
+# Pesos dos dígitos verificadores (primeiro sobre 9 dígitos, segundo sobre 10)
+PESOS_DV1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_DV2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Função para verificar se o NumPy está disponível
+def numpy_disponivel():
+    """Retorna True se o motor vetorizado pode ser usado."""
+    return np is not None
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError("O motor vetorizado de CPF requer o NumPy instalado.")
+
+# Função para calcular os dígitos verificadores de uma matriz (N, 11) in-place
+def _calcular_digitos_verificadores(matriz):
+    """Preenche as colunas 9 e 10 da matriz a partir dos 9 primeiros dígitos."""
+    pesos1 = np.asarray(PESOS_DV1, dtype=np.int32)
+    pesos2 = np.asarray(PESOS_DV2, dtype=np.int32)
+    soma1 = matriz[:, :9].astype(np.int32) @ pesos1
+    matriz[:, 9] = (soma1 * 10) % 11 % 10
+    soma2 = matriz[:, :10].astype(np.int32) @ pesos2
+    matriz[:, 10] = (soma2 * 10) % 11 % 10
+    return matriz
+
+# Função para gerar a matriz de dígitos de N CPFs válidos
+def gerar_matriz_cpf(n, rng=None):
+    """Gera uma matriz uint8 (N, 11) em que cada linha são os dígitos de um CPF válido."""
+    _exigir_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    matriz = np.empty((n, 11), dtype=np.uint8)
+    matriz[:, :9] = rng.integers(0, 10, size=(n, 9), dtype=np.uint8)
+    return _calcular_digitos_verificadores(matriz)
+
+# Função para montar a matriz de dígitos a partir de bases já escolhidas
+def matriz_de_bases(bases):
+    """Retorna a matriz uint8 (N, 11) dos CPFs cujas bases (0 a 999999999) foram informadas."""
+    _exigir_numpy()
+    restos = np.asarray(bases, dtype=np.uint32)
+    matriz = np.empty((len(restos), 11), dtype=np.uint8)
+    for coluna in range(8, -1, -1):
+        restos, matriz[:, coluna] = np.divmod(restos, np.uint32(10))
+    return _calcular_digitos_verificadores(matriz)
+
+# Função para sortear N bases de CPF (9 primeiros dígitos) como inteiros
+def gerar_bases(n, rng=None):
+    """Retorna um array int64 com n bases; consome o gerador como gerar_matriz_cpf (mesmo rng, mesmas bases)."""
+    _exigir_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    digitos = rng.integers(0, 10, size=(n, 9), dtype=np.uint8)
+    return digitos.astype(np.int64) @ (10 ** np.arange(8, -1, -1, dtype=np.int64))
+
+# Função para converter a matriz de dígitos em inteiros de 64 bits
+def matriz_para_inteiros(matriz):
+    """Converte cada linha da matriz de dígitos no CPF como int64 (sem zeros à esquerda)."""
+    potencias = 10 ** np.arange(10, -1, -1, dtype=np.int64)
+    return matriz.astype(np.int64) @ potencias
+
+# Função para converter a matriz de dígitos em strings de bytes de largura fixa
+def matriz_para_bytes(matriz):
+    """Converte a matriz de dígitos num array 'S11' (ASCII) sem laço por linha."""
+    caracteres = np.ascontiguousarray(matriz + np.uint8(ord("0")))
+    return caracteres.view("S11").reshape(-1)
+
+# Função para gerar N CPFs válidos de forma vetorizada
+def gerar_cpfs_vetorizado(n, formato="int", rng=None):
+    """Gera n CPFs válidos como array int64 (formato="int") ou 'S11' (formato="bytes")."""
+    matriz = gerar_matriz_cpf(n, rng)
+    if formato == "int":
+        return matriz_para_inteiros(matriz)
+    if formato == "bytes":
+        return matriz_para_bytes(matriz)
+    raise ValueError(f"Formato inválido: {formato!r} (use 'int' ou 'bytes').")
+
+# Função para converter valores existentes em matriz de dígitos
+def _para_matriz(valores):
+    """Aceita inteiros, bytes/strings de 11 dígitos e devolve (matriz, linhas_bem_formadas)."""
+    array = np.asarray(valores)
+    if array.dtype.kind in "iu":
+        inteiros = array.astype(np.int64).reshape(-1)
+        potencias = 10 ** np.arange(10, -1, -1, dtype=np.int64)
+        matriz = (inteiros[:, None] // potencias) % 10
+        bem_formados = (inteiros >= 0) & (inteiros < 10 ** 11)
+        return matriz.astype(np.uint8), bem_formados
+    if array.dtype.kind == "U":
+        array = np.char.encode(array, "ascii", "replace")
+    if array.dtype.kind != "S":
+        raise TypeError(f"Tipo de dado não suportado para CPF: {array.dtype}")
+
+    array = array.reshape(-1)
+    tamanhos = np.char.str_len(array)
+    bytes_fixos = np.ascontiguousarray(array.astype("S11"))
+    brutos = np.frombuffer(bytes_fixos.tobytes(), dtype=np.uint8).reshape(-1, 11)
+    matriz = brutos - np.uint8(ord("0"))
+    bem_formados = (tamanhos == 11) & (matriz <= 9).all(axis=1)
+    return matriz, bem_formados
+
+# Função para validar vários CPFs de forma vetorizada
+def validar_cpf(valores):
+    """Retorna um array booleano indicando, para cada CPF, se os dígitos verificadores conferem.
+
+    Aceita um array/lista de inteiros (sem formatação) ou de strings/bytes com 11 dígitos.
+    """
+    _exigir_numpy()
+    matriz, bem_formados = _para_matriz(valores)
+    esperado = _calcular_digitos_verificadores(matriz.copy())
+    return bem_formados & (esperado[:, 9:] == matriz[:, 9:]).all(axis=1)
+
+# Função para comparar o desempenho do motor escalar com os motores em lote
+def benchmark(n=1000000):
+    """Mede CPFs por segundo de gerar_cpf_valido, dados.gerar_cpfs e do motor NumPy."""
+    from dados import gerar_cpf_valido, gerar_cpfs
+
+    resultados = {}
+
+    amostra_escalar = min(n, 100000)
+    inicio = time.perf_counter()
+    for _ in range(amostra_escalar):
+        gerar_cpf_valido()
+    resultados["gerar_cpf_valido"] = amostra_escalar / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    gerar_cpfs(n)
+    resultados["dados.gerar_cpfs"] = n / (time.perf_counter() - inicio)
+
+    if numpy_disponivel():
+        for formato in ("int", "bytes"):
+            inicio = time.perf_counter()
+            gerar_cpfs_vetorizado(n, formato)
+            resultados[f"numpy ({formato})"] = n / (time.perf_counter() - inicio)
+
+        cpfs = gerar_cpfs_vetorizado(n, "bytes")
+        inicio = time.perf_counter()
+        validos = validar_cpf(cpfs)
+        resultados["numpy validar_cpf"] = n / (time.perf_counter() - inicio)
+        assert validos.all()
+    else:
+        logging.warning("NumPy não instalado: motor vetorizado fora do benchmark.")
+
+    base = resultados["gerar_cpf_valido"]
+    for nome, por_segundo in resultados.items():
+        print(f"{nome:<22} {por_segundo:>14,.0f} CPFs/s  ({por_segundo / base:,.1f}x)")
+    return resultados
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
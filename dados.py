@@ -3,7 +3,16 @@ import sqlite3
 import os
 import sys
 import shutil
+import hashlib
 import logging
+import threading
+import time
+
+import cpf
+import amostragem
+import conexao
+import instrumentacao
+import vocabulario_binario
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -11,6 +20,10 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Constantes
 DATABASE_NAME = 'nomes.db'
 MODEL_DATABASE_NAME = 'assets/modelo_nomes.db'
+# Colunas de cada lote de usuários, na ordem usada pelas exportações
+COLUNAS_USUARIO = ("nome", "login", "cpf", "celular", "celular_sem_formatacao")
+# Intervalo mínimo (em segundos) entre verificações de alteração do arquivo do banco
+INTERVALO_VERIFICACAO_BANCO = 1.0
 
 # Função para obter o caminho do arquivo de recurso
 def resource_path(relative_path):
@@ -30,86 +43,349 @@ def inicializar_banco_de_dados():
         shutil.copy(modelo_db_path, db_path)
         logging.info("Banco de dados 'nomes.db' copiado para a pasta do executável.")
 
+# Caminho do banco escolhido em tempo de execução (None = nomes.db ao lado do programa)
+_caminho_banco = None
+
 # Função para obter o caminho do banco de dados
 def get_db_path():
     """Retorna o caminho absoluto do banco de dados, dependendo do ambiente."""
+    if _caminho_banco is not None:
+        return _caminho_banco
     if getattr(sys, 'frozen', False):
         base_path = os.path.dirname(sys.executable)
     else:
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, DATABASE_NAME)
 
-# Função para conectar ao banco de dados
-def conectar_banco_de_dados():
-    """Conecta ao banco de dados SQLite, inicializando se necessário."""
+# Caminhos de bancos cujo esquema já foi preparado neste processo
+_bancos_preparados = set()
+_bancos_preparados_lock = threading.Lock()
+
+# Função para preparar o banco de dados uma única vez por processo
+def preparar_banco_de_dados():
+    """Copia o banco modelo se necessário e garante as tabelas, só na primeira chamada do processo."""
     db_path = get_db_path()
-    try:
+    if db_path in _bancos_preparados:
+        return db_path
+
+    with _bancos_preparados_lock:
+        if db_path in _bancos_preparados:
+            return db_path
         inicializar_banco_de_dados()
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS nomes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                genero TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS adjetivos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                adjetivo TEXT NOT NULL
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ddd (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo TEXT NOT NULL
-            )
-        ''')
-        conn.commit()
-        return conn
-    except sqlite3.Error as e:
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS nomes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nome TEXT NOT NULL,
+                    genero TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS adjetivos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    adjetivo TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ddd (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    codigo TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+        conexao.registrar(inicializacoes_esquema=1)
+        _bancos_preparados.add(db_path)
+    return db_path
+
+# Função para conectar ao banco de dados
+def conectar_banco_de_dados():
+    """Abre uma conexão de leitura e escrita ao banco SQLite, preparando-o na primeira vez.
+
+    As consultas do gerador usam a conexão persistente somente leitura de conexao.py;
+    esta função fica para quem precisa escrever no banco.
+    """
+    try:
+        return sqlite3.connect(preparar_banco_de_dados())
+    except (sqlite3.Error, OSError) as e:
         logging.error(f"Erro ao conectar ao banco de dados: {e}")
         return None
 
-# Função para obter um nome aleatório do banco de dados
-def gerar_nome(genero=None):
-    conn = conectar_banco_de_dados()
-    if conn is None:
-        return "Nome Desconhecido"
-    
-    cursor = conn.cursor()
+# Classe que mantém o vocabulário do banco de dados em memória
+class Vocabulario:
+    """Nomes (separados por gênero), adjetivos e DDDs carregados do banco em tuplas imutáveis.
+
+    Quando o banco tem primeiros nomes e sobrenomes importados (setup_db.py), `nomes_*`
+    guardam só os primeiros nomes e o nome completo é composto na geração com `sobrenomes`.
+    `tabelas` guarda uma TabelaAlias por conjunto ("M", "F", "N", "sobrenomes", "adjetivos",
+    "ddds") para sorteios ponderados pela frequência/população em O(1).
+    """
+
+    __slots__ = (
+        "nomes_masculinos", "nomes_femininos", "nomes_todos", "sobrenomes",
+        "adjetivos", "ddds", "assinatura", "tabelas", "_primeiros",
+    )
+
+    def __init__(self, nomes_masculinos, nomes_femininos, nomes_todos, adjetivos, ddds, assinatura=None,
+                 sobrenomes=(), tabelas=None):
+        self.nomes_masculinos = nomes_masculinos
+        self.nomes_femininos = nomes_femininos
+        self.nomes_todos = nomes_todos
+        self.sobrenomes = sobrenomes
+        self.adjetivos = adjetivos
+        self.ddds = ddds
+        self.assinatura = assinatura
+        self.tabelas = tabelas or {}
+        self._primeiros = {}
+
+    def valores(self, chave):
+        """Retorna a tupla de valores do conjunto ("M", "F", "N", "sobrenomes", "adjetivos" ou "ddds")."""
+        if chave in ("sobrenomes", "adjetivos", "ddds"):
+            return getattr(self, chave)
+        return self.nomes(chave)
+
+    def tabela(self, chave):
+        """Retorna a TabelaAlias do conjunto (uniforme se não houver pesos no banco)."""
+        if chave not in ("M", "F", "sobrenomes", "adjetivos", "ddds"):
+            chave = "N"
+        tabela = self.tabelas.get(chave)
+        if tabela is None:
+            tabela = amostragem.TabelaAlias.construir([1] * len(self.valores(chave)))
+            self.tabelas[chave] = tabela
+        return tabela
+
+    def sortear(self, chave, rng=None):
+        """Sorteia um valor do conjunto, respeitando os pesos."""
+        return self.valores(chave)[self.tabela(chave).sortear(rng)]
+
+    def sortear_indices(self, chave, n, rng=None):
+        """Sorteia n índices do conjunto de uma vez, respeitando os pesos."""
+        return self.tabela(chave).sortear_lote(n, rng)
+
+    def nomes(self, genero=None):
+        """Retorna a tupla de nomes do gênero informado ("M", "F" ou qualquer outro valor para todos)."""
+        if genero == "M":
+            return self.nomes_masculinos
+        if genero == "F":
+            return self.nomes_femininos
+        return self.nomes_todos
+
+    def compor_nome(self, nome, sobrenome):
+        """Junta o nome sorteado ao sobrenome (se o vocabulário tiver sobrenomes separados)."""
+        return f"{nome} {sobrenome}" if sobrenome else nome
+
+    def primeiros_nomes(self, genero=None):
+        """Retorna, alinhada a nomes(genero), a tupla com o primeiro nome em minúsculas usado nos logins."""
+        chave = genero if genero in ("M", "F") else None
+        primeiros = self._primeiros.get(chave)
+        if primeiros is None:
+            primeiros = tuple(nome.split()[0].lower() if nome else "usuario" for nome in self.nomes(chave))
+            self._primeiros[chave] = primeiros
+        return primeiros
+
+# Classe do vocabulário lido do arquivo binário mapeado em memória (vocabulario_binario.py)
+class VocabularioMapeado(Vocabulario):
+    """Vocabulario sobre um VocabularioBinario: abrir e usar não dependem do tamanho do vocabulário.
+
+    As tabelas de alias usam direto as seções mapeadas e cada conjunto de texto é uma
+    TextosMapeados: tamanho e teste de vazio vêm dos deslocamentos e só os textos sorteados
+    são decodificados. Enviado a outro processo (pickle), só leva o caminho: o filho mapeia
+    o mesmo arquivo e as páginas ficam compartilhadas.
+    """
+
+    __slots__ = ("binario",)
+
+    def __init__(self, binario, assinatura=None):
+        self.binario = binario
+        self.assinatura = assinatura
+        self.tabelas = {chave: binario.tabela_alias(chave) for chave in vocabulario_binario.CHAVES_ALIAS}
+        self.nomes_todos = binario.sequencia("nomes")
+        self.nomes_masculinos = binario.sequencia("nomes", "M.indices")
+        self.nomes_femininos = binario.sequencia("nomes", "F.indices")
+        self.sobrenomes = binario.sequencia("sobrenomes")
+        self.adjetivos = binario.sequencia("adjetivos")
+        self.ddds = binario.sequencia("ddds")
+        self._primeiros = {
+            "M": binario.sequencia("primeiros", "M.indices"),
+            "F": binario.sequencia("primeiros", "F.indices"),
+            None: binario.sequencia("primeiros"),
+        }
+
+    def primeiros_nomes(self, genero=None):
+        return self._primeiros[genero if genero in ("M", "F") else None]
+
+    def __reduce__(self):
+        return _reabrir_vocabulario_mapeado, (self.binario.caminho, self.assinatura)
+
+# Função para reabrir, noutro processo, o vocabulário binário de um VocabularioMapeado
+def _reabrir_vocabulario_mapeado(caminho, assinatura):
+    return VocabularioMapeado(vocabulario_binario.VocabularioBinario(caminho), assinatura)
+
+# Cache do vocabulário em memória
+_vocabulario = None
+_vocabulario_verificado_em = 0.0
+_vocabulario_lock = threading.Lock()
+
+# Função para obter a assinatura (mtime e tamanho) do arquivo do banco de dados
+def _assinatura_banco(db_path):
+    """Retorna uma tupla que muda sempre que o arquivo do banco é alterado."""
+    conexao.registrar(verificacoes_arquivo=1)
     try:
-        if genero in ["M", "F"]:
-            cursor.execute('SELECT nome FROM nomes WHERE genero = ? ORDER BY RANDOM() LIMIT 1', (genero,))
-        else:
-            cursor.execute('SELECT nome FROM nomes ORDER BY RANDOM() LIMIT 1')
-        resultado = cursor.fetchone()
-    except sqlite3.Error as e:
-        logging.error(f"Erro ao executar a consulta de nome: {e}")
+        estado = os.stat(db_path)
+    except OSError:
+        return None
+    return (estado.st_mtime_ns, estado.st_size)
+
+# Função para descobrir a coluna de peso de uma tabela do vocabulário
+def _coluna_peso(db_path, tabela, candidatas=("frequencia", "populacao")):
+    """Retorna o nome da primeira coluna de peso existente na tabela, ou "1" (pesos iguais)."""
+    colunas = {linha[1] for linha in conexao.consultar(db_path, f"PRAGMA table_info({tabela})")}
+    return next((coluna for coluna in candidatas if coluna in colunas), "1")
+
+# Função para ler (valor, peso) de uma tabela do vocabulário
+def _ler_com_peso(db_path, tabela, colunas):
+    peso = _coluna_peso(db_path, tabela)
+    return conexao.consultar(db_path, f"SELECT {colunas}, COALESCE({peso}, 1) FROM {tabela} ORDER BY id")
+
+# Função para carregar o vocabulário do banco de dados para a memória
+def carregar_vocabulario(usar_binario=True):
+    """Lê as tabelas de nomes, adjetivos e ddd uma única vez e retorna um Vocabulario.
+
+    Se houver um vocabulário binário atualizado ao lado do banco (gerado pelo setup_db.py),
+    retorna um VocabularioMapeado sem consultar o SQLite. Senão, usa primeiros_nomes e
+    sobrenomes quando essas tabelas existem e têm linhas; caso contrário, os nomes completos
+    da tabela nomes. As tabelas de alias (pesos das colunas frequencia/populacao) são lidas
+    do arquivo .alias ao lado do banco quando ainda valem para ele, ou construídas e salvas
+    nesse arquivo.
+    """
+    if usar_binario:
+        try:
+            inicializar_banco_de_dados()
+        except OSError as e:
+            logging.error(f"Erro ao carregar o vocabulário: {e}")
+            return None
+        db_path = get_db_path()
+        binario = vocabulario_binario.abrir(db_path)
+        if binario is not None:
+            logging.info(f"Vocabulário binário carregado: {binario.quantidade('nomes')} nomes, "
+                         f"{binario.quantidade('sobrenomes')} sobrenomes.")
+            return VocabularioMapeado(binario, _assinatura_banco(db_path))
+
+    try:
+        db_path = preparar_banco_de_dados()
+        assinatura = _assinatura_banco(db_path)
+        tabelas = {linha[0] for linha in conexao.consultar(db_path, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        linhas_nomes = linhas_sobrenomes = ()
+        if "primeiros_nomes" in tabelas:
+            linhas_nomes = _ler_com_peso(db_path, "primeiros_nomes", "nome, genero")
+        if linhas_nomes and "sobrenomes" in tabelas:
+            linhas_sobrenomes = _ler_com_peso(db_path, "sobrenomes", "sobrenome")
+        if not linhas_nomes:
+            linhas_nomes = _ler_com_peso(db_path, "nomes", "nome, genero")
+        linhas_adjetivos = _ler_com_peso(db_path, "adjetivos", "adjetivo")
+        linhas_ddds = _ler_com_peso(db_path, "ddd", "codigo")
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"Erro ao carregar o vocabulário: {e}")
+        return None
+
+    masculinos = [(nome, peso) for nome, genero, peso in linhas_nomes if genero == "M"]
+    femininos = [(nome, peso) for nome, genero, peso in linhas_nomes if genero == "F"]
+    adjetivos = tuple(linha[0] for linha in linhas_adjetivos)
+    ddds = tuple(linha[0] for linha in linhas_ddds)
+    sobrenomes = tuple(linha[0] for linha in linhas_sobrenomes)
+
+    tabelas_alias = amostragem.carregar_tabelas(db_path, assinatura)
+    if tabelas_alias is None:
+        construir = amostragem.TabelaAlias.construir
+        tabelas_alias = {
+            "M": construir(peso for _, peso in masculinos),
+            "F": construir(peso for _, peso in femininos),
+            "N": construir(linha[2] for linha in linhas_nomes),
+            "sobrenomes": construir(linha[1] for linha in linhas_sobrenomes),
+            "adjetivos": construir(linha[1] for linha in linhas_adjetivos),
+            "ddds": construir(linha[1] for linha in linhas_ddds),
+        }
+        amostragem.salvar_tabelas(db_path, assinatura, tabelas_alias)
+
+    vocabulario = Vocabulario(
+        nomes_masculinos=tuple(nome for nome, _ in masculinos),
+        nomes_femininos=tuple(nome for nome, _ in femininos),
+        nomes_todos=tuple(linha[0] for linha in linhas_nomes),
+        adjetivos=adjetivos,
+        ddds=ddds,
+        assinatura=assinatura,
+        sobrenomes=sobrenomes,
+        tabelas=tabelas_alias,
+    )
+    logging.info(
+        f"Vocabulário carregado: {len(vocabulario.nomes_todos)} nomes, {len(sobrenomes)} sobrenomes, "
+        f"{len(adjetivos)} adjetivos, {len(ddds)} DDDs."
+    )
+    return vocabulario
+
+# Função para obter o vocabulário em cache, recarregando se o banco mudou
+def obter_vocabulario():
+    """Retorna o vocabulário em memória, recarregando-o quando o arquivo do banco é alterado."""
+    global _vocabulario, _vocabulario_verificado_em
+
+    vocabulario = _vocabulario
+    agora = time.monotonic()
+    if vocabulario is not None and agora - _vocabulario_verificado_em < INTERVALO_VERIFICACAO_BANCO:
+        return vocabulario
+
+    with _vocabulario_lock:
+        vocabulario = _vocabulario
+        if vocabulario is None or _assinatura_banco(get_db_path()) != vocabulario.assinatura:
+            if vocabulario is not None:
+                # O arquivo mudou: a conexão aberta pode apontar para o arquivo antigo
+                conexao.invalidar_conexoes()
+            with instrumentacao.etapa("vocabulario.carregar"):
+                vocabulario = carregar_vocabulario()
+            _vocabulario = vocabulario
+        _vocabulario_verificado_em = time.monotonic()
+    return vocabulario
+
+# Função para descartar o vocabulário em cache
+def invalidar_vocabulario():
+    """Força a releitura do banco de dados na próxima geração."""
+    global _vocabulario
+    with _vocabulario_lock:
+        _vocabulario = None
+    conexao.invalidar_conexoes()
+
+# Função para trocar o banco de dados usado pelo gerador
+def definir_caminho_banco(db_path):
+    """Passa a ler o vocabulário de `db_path` (None volta ao banco padrão), descartando o cache atual."""
+    global _caminho_banco
+    _caminho_banco = os.path.abspath(db_path) if db_path else None
+    invalidar_vocabulario()
+
+# Função para obter os valores de várias posições de um conjunto do vocabulário
+def selecionar(valores, indices):
+    """Retorna [valores[i] for i in indices]; num conjunto mapeado, decodifica só as posições pedidas."""
+    if isinstance(valores, vocabulario_binario.TextosMapeados):
+        return valores.selecionar(indices)
+    return [valores[i] for i in indices]
+
+# Função para obter um nome aleatório do vocabulário
+def gerar_nome(genero=None):
+    vocabulario = obter_vocabulario()
+    nomes = vocabulario.nomes(genero) if vocabulario is not None else ()
+    if not nomes:
         return "Nome Desconhecido"
-    finally:
-        conn.close()
-    
-    return resultado[0] if resultado else "Nome Desconhecido"
+    sobrenome = vocabulario.sortear("sobrenomes") if vocabulario.sobrenomes else None
+    return vocabulario.compor_nome(vocabulario.sortear(genero), sobrenome)
 
 # Função para gerar um login baseado no nome e adjetivo
 def gerar_login(nome):
-    conn = conectar_banco_de_dados()
-    if conn is None:
-        return "login_default"
-    
-    cursor = conn.cursor()
-    try:
-        cursor.execute('SELECT adjetivo FROM adjetivos ORDER BY RANDOM() LIMIT 1')
-        resultado = cursor.fetchone()
-    except sqlite3.Error as e:
-        logging.error(f"Erro ao executar a consulta de adjetivo: {e}")
+    vocabulario = obter_vocabulario()
+    if vocabulario is None:
         return "login_default"
-    finally:
-        conn.close()
 
-    adjetivo = resultado[0] if resultado else "oficial"
+    adjetivo = vocabulario.sortear("adjetivos") if vocabulario.adjetivos else "oficial"
     primeiro_nome = nome.split()[0].lower() if nome else "usuario"
     sequencia_numerica = str(random.randint(10, 999))
     login = f"{primeiro_nome}{adjetivo}{sequencia_numerica}"
@@ -132,34 +408,226 @@ def gerar_cpf_valido():
 # Função para gerar um número de celular válido
 def gerar_numero_celular_completo():
     """Gera um número de celular válido e retorna ele em dois formatos: formatado e sem formatação."""
-    conn = conectar_banco_de_dados()
-    if conn is None:
-        return "Número Inválido", "Número Inválido"
-    
-    cursor = conn.cursor()
-    try:
-        cursor.execute('SELECT codigo FROM ddd ORDER BY RANDOM() LIMIT 1')
-        ddd = cursor.fetchone()[0]
-    except sqlite3.Error as e:
-        logging.error(f"Erro ao buscar DDD: {e}")
+    vocabulario = obter_vocabulario()
+    if vocabulario is None or not vocabulario.ddds:
         return "Número Inválido", "Número Inválido"
-    finally:
-        conn.close()
 
+    ddd = vocabulario.sortear("ddds")
     numero_base = f"9{random.randint(10000000, 99999999)}"
     numero_formatado = f"({ddd}) {numero_base}"
     numero_sem_formatacao = f"{ddd}{numero_base}"
 
     return numero_formatado, numero_sem_formatacao
 
+# Tabelas com a soma ponderada de cada grupo de 3 dígitos, usadas no cálculo em lote dos dígitos do CPF
+def _tabela_pesos_cpf(pesos):
+    return tuple(
+        (g // 100) * pesos[0] + (g // 10 % 10) * pesos[1] + (g % 10) * pesos[2]
+        for g in range(1000)
+    )
+
+_PESOS_DV1 = [_tabela_pesos_cpf((10, 9, 8)), _tabela_pesos_cpf((7, 6, 5)), _tabela_pesos_cpf((4, 3, 2))]
+_PESOS_DV2 = [_tabela_pesos_cpf((11, 10, 9)), _tabela_pesos_cpf((8, 7, 6)), _tabela_pesos_cpf((5, 4, 3))]
+_DIGITO_VERIFICADOR = tuple((soma * 10) % 11 % 10 for soma in range(11))
+
+# Função para sortear as bases (9 primeiros dígitos) de vários CPFs
+def gerar_bases_cpf(n, rng=None):
+    """Sorteia n bases de CPF (inteiros de 0 a 999999999).
+
+    Usa o motor vetorizado de cpf.py quando o NumPy está instalado (e retorna o array int64,
+    sem converter para lista); sem ele, retorna uma lista. `rng` é um random.Random opcional
+    (padrão: o módulo random) do qual também é derivada a semente do gerador do NumPy.
+    """
+    rng = rng if rng is not None else random
+    if cpf.numpy_disponivel():
+        gerador_numpy = cpf.np.random.default_rng(rng.getrandbits(64))
+        return cpf.gerar_bases(n, gerador_numpy)
+    return rng.choices(range(1000000000), k=n)
+
+# Função para completar várias bases de CPF com os dígitos verificadores
+def completar_cpfs(bases):
+    """Retorna a lista de CPFs (strings de 11 dígitos) das bases informadas.
+
+    Com o NumPy, calcula os dígitos de todas as bases de uma vez; sem ele, por tabelas de 3 dígitos.
+    """
+    if cpf.numpy_disponivel() and len(bases) >= 64:
+        return [valor.decode("ascii") for valor in cpf.matriz_para_bytes(cpf.matriz_de_bases(bases)).tolist()]
+
+    t1_a, t1_b, t1_c = _PESOS_DV1
+    t2_a, t2_b, t2_c = _PESOS_DV2
+    dv = _DIGITO_VERIFICADOR
+    cpfs = []
+    for base in bases:
+        a, resto = divmod(base, 1000000)
+        b, c = divmod(resto, 1000)
+        d1 = dv[(t1_a[a] + t1_b[b] + t1_c[c]) % 11]
+        d2 = dv[(t2_a[a] + t2_b[b] + t2_c[c] + 2 * d1) % 11]
+        cpfs.append(base * 100 + d1 * 10 + d2)
+    return [f"{numero:011d}" for numero in cpfs]
+
+# Função para gerar vários CPFs válidos de uma vez
+def gerar_cpfs(n, rng=None):
+    """Gera uma lista com n CPFs válidos (ver gerar_bases_cpf)."""
+    return completar_cpfs(gerar_bases_cpf(n, rng))
+
+# Função para completar uma base de 9 dígitos com os dígitos verificadores
+def completar_cpf(base):
+    """Retorna o CPF (string de 11 dígitos) cuja base numérica é `base` (0 a 999999999)."""
+    a, resto = divmod(base, 1000000)
+    b, c = divmod(resto, 1000)
+    d1 = _DIGITO_VERIFICADOR[(_PESOS_DV1[0][a] + _PESOS_DV1[1][b] + _PESOS_DV1[2][c]) % 11]
+    d2 = _DIGITO_VERIFICADOR[(_PESOS_DV2[0][a] + _PESOS_DV2[1][b] + _PESOS_DV2[2][c] + 2 * d1) % 11]
+    return f"{base:09d}{d1}{d2}"
+
+# Função para fazer os sorteios de vários usuários, sem montar as strings
+def sortear_usuarios(n, genero=None, rng=None, vocabulario=None):
+    """Sorteia os campos de n usuários e retorna um dicionário de listas de inteiros.
+
+    Chaves: n, genero, indices_nomes e indices_sobrenomes (posições em vocabulario.nomes(genero)
+    e vocabulario.sobrenomes), indices_adjetivos, sequencias (sufixo do login), indices_ddds,
+    numeros (8 dígitos após o 9 do celular) e bases_cpf (ver gerar_bases_cpf). Conjuntos
+    ausentes do vocabulário ficam None. montar_usuarios transforma o resultado nas colunas
+    de gerar_usuarios.
+    """
+    rng = rng if rng is not None else random
+    vocabulario = vocabulario if vocabulario is not None else obter_vocabulario()
+    sorteios = dict.fromkeys(("indices_nomes", "indices_sobrenomes", "indices_adjetivos", "sequencias",
+                              "indices_ddds", "numeros"))
+    sorteios["n"], sorteios["genero"] = n, genero
+
+    # Sorteios sempre nesta ordem: a saída de um rng semeado não muda
+    with instrumentacao.etapa("amostragem", n):
+        if vocabulario is not None:
+            if vocabulario.nomes(genero):
+                sorteios["indices_nomes"] = vocabulario.sortear_indices(genero, n, rng)
+                if vocabulario.sobrenomes:
+                    sorteios["indices_sobrenomes"] = vocabulario.sortear_indices("sobrenomes", n, rng)
+            if vocabulario.adjetivos:
+                sorteios["indices_adjetivos"] = vocabulario.sortear_indices("adjetivos", n, rng)
+            sorteios["sequencias"] = rng.choices(range(10, 1000), k=n)
+            if vocabulario.ddds:
+                sorteios["indices_ddds"] = vocabulario.sortear_indices("ddds", n, rng)
+                sorteios["numeros"] = rng.choices(range(10000000, 100000000), k=n)
+
+    with instrumentacao.etapa("cpf", n):
+        sorteios["bases_cpf"] = gerar_bases_cpf(n, rng)
+    return sorteios
+
+# Função para gerar vários usuários de uma vez, em colunas
+def gerar_usuarios(n, genero=None, rng=None):
+    """Gera n usuários e retorna um dicionário de colunas (listas alinhadas por posição).
+
+    As colunas são: nome, login, cpf, celular (formatado) e celular_sem_formatacao.
+    Todos os sorteios são feitos em bloco (sortear_usuarios) e as strings montadas em
+    passadas por coluna (montar_usuarios), com a mesma semântica das funções unitárias
+    (login com até 16 caracteres e celular iniciado por 9). Com um `rng` (random.Random)
+    semeado, o lote é reprodutível.
+    """
+    vocabulario = obter_vocabulario()
+    return montar_usuarios(sortear_usuarios(n, genero, rng, vocabulario), vocabulario)
+
+# Função para montar as colunas de um lote a partir dos valores já sorteados
+def montar_usuarios(sorteios, vocabulario):
+    """Monta o dicionário de colunas de gerar_usuarios a partir do resultado de sortear_usuarios.
+
+    Índices None (ou vocabulário sem o conjunto) usam os mesmos valores padrão das funções unitárias.
+    Na instrumentação, os dígitos verificadores contam na etapa "cpf.digitos" (o sorteio das
+    bases fica em "cpf") e as strings, em "formatacao".
+    """
+    n, genero = sorteios["n"], sorteios["genero"]
+    with instrumentacao.etapa("cpf.digitos", n):
+        cpfs = completar_cpfs(sorteios["bases_cpf"])
+
+    with instrumentacao.etapa("formatacao", n):
+        indices_nomes = sorteios["indices_nomes"]
+        if indices_nomes is not None:
+            nomes_disponiveis = vocabulario.nomes(genero)
+            primeiros_disponiveis = vocabulario.primeiros_nomes(genero)
+            nomes = selecionar(nomes_disponiveis, indices_nomes)
+            primeiros = selecionar(primeiros_disponiveis, indices_nomes)
+            if sorteios["indices_sobrenomes"] is not None:
+                sobrenomes_disponiveis = vocabulario.sobrenomes
+                sobrenomes = selecionar(sobrenomes_disponiveis, sorteios["indices_sobrenomes"])
+                nomes = [f"{nome} {sobrenome}" for nome, sobrenome in zip(nomes, sobrenomes)]
+        else:
+            nomes = ["Nome Desconhecido"] * n
+            primeiros = ["nome"] * n
+
+        if vocabulario is None:
+            logins = ["login_default"] * n
+        else:
+            if sorteios["indices_adjetivos"] is not None:
+                adjetivos_disponiveis = vocabulario.adjetivos
+                adjetivos = selecionar(adjetivos_disponiveis, sorteios["indices_adjetivos"])
+            else:
+                adjetivos = ["oficial"] * n
+            logins = [f"{p}{a}{s}"[:16] for p, a, s in zip(primeiros, adjetivos, sorteios["sequencias"])]
+
+        if sorteios["indices_ddds"] is not None:
+            ddds_disponiveis = vocabulario.ddds
+            ddds = selecionar(ddds_disponiveis, sorteios["indices_ddds"])
+            numeros = sorteios["numeros"]
+            celulares = [f"({d}) 9{m}" for d, m in zip(ddds, numeros)]
+            celulares_sem_formatacao = [f"{d}9{m}" for d, m in zip(ddds, numeros)]
+        else:
+            celulares = celulares_sem_formatacao = ["Número Inválido"] * n
+
+    return {
+        "nome": nomes,
+        "login": logins,
+        "cpf": cpfs,
+        "celular": celulares,
+        "celular_sem_formatacao": celulares_sem_formatacao,
+    }
+
+# Função para planejar os lotes de uma geração
+def planejar_lotes(total, tamanho_lote, inicio=0):
+    """Gera (índice do lote, tamanho, registros a descartar no começo) para os registros [inicio, total).
+
+    Os lotes são sempre alinhados a múltiplos de `tamanho_lote`, então os registros gerados a
+    partir de `inicio` são os mesmos de uma geração completa de `total` com a mesma semente.
+    Os registros anteriores a `inicio` só coincidem se tiverem sido gerados com esse mesmo
+    `total` (ou com um total múltiplo de `tamanho_lote`): um último lote incompleto é sorteado
+    com o seu tamanho, então ele difere do lote cheio de uma geração maior. Para registros
+    que não dependem do total nem do lote, use indexado.gerar_lotes_indexados.
+    """
+    if tamanho_lote <= 0:
+        raise ValueError("O tamanho do lote deve ser positivo.")
+    indice, descartar = divmod(max(inicio, 0), tamanho_lote)
+    posicao = indice * tamanho_lote
+    while posicao < total:
+        yield indice, min(tamanho_lote, total - posicao), descartar
+        indice += 1
+        posicao += tamanho_lote
+        descartar = 0
+
+# Função para recortar um lote de usuários
+def fatiar_lote(lote, inicio, fim=None):
+    """Retorna um novo lote com as linhas [inicio, fim) de todas as colunas."""
+    return {coluna: valores[inicio:fim] for coluna, valores in lote.items()}
+
+# Função para derivar a semente de um lote a partir da semente mestre
+def derivar_semente(semente, indice):
+    """Deriva, de forma determinística e independente de processo, a semente do lote `indice`."""
+    digest = hashlib.blake2b(f"{semente}:{indice}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+# Função para instalar um vocabulário já carregado (ex.: recebido por um processo filho)
+def instalar_vocabulario(vocabulario):
+    """Usa o vocabulário informado como cache, sem abrir o banco de dados."""
+    global _vocabulario, _vocabulario_verificado_em
+    with _vocabulario_lock:
+        _vocabulario = vocabulario
+        _vocabulario_verificado_em = time.monotonic()
+
 # Testando geração de nomes, logins, CPF e celular
 if __name__ == "__main__":
     for genero in ["M", "F", None]:
         nome = gerar_nome(genero)
         login = gerar_login(nome)
-        cpf = gerar_cpf_valido()
+        cpf_exemplo = gerar_cpf_valido()
         celular = gerar_numero_celular_completo()
         print(f"Nome ({'Masculino' if genero == 'M' else 'Feminino' if genero == 'F' else 'Qualquer'}): {nome}")
         print(f"Login: {login}")
-        print(f"CPF: {cpf}")
+        print(f"CPF: {cpf_exemplo}")
         print(f"Celular: {celular}\n")
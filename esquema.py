@@ -0,0 +1,335 @@
+import os
+import json
+import random
+import string
+import datetime
+import unicodedata
+
+import dados
+import amostragem
+
+# Tipos de campo que vêm dos sorteios de dados.sortear_usuarios (um único sorteio para todos)
+TIPOS_BASE = ("nome", "login", "cpf", "celular")
+# Demais tipos de campo aceitos no esquema
+TIPOS = TIPOS_BASE + ("vocabulario", "escolha", "inteiro", "data", "padrao", "modelo", "email")
+# Tipos que geram números: não aceitam tamanho_maximo nem nulos (que só valem para texto)
+TIPOS_NUMERICOS = ("inteiro",)
+# Domínios usados pelo tipo "email" quando o esquema não informa outros
+DOMINIOS_EMAIL = ("gmail.com", "hotmail.com", "outlook.com", "yahoo.com.br", "uol.com.br", "bol.com.br")
+
+# Esquemas embutidos; "padrao" gera exatamente as colunas (e os valores) de dados.gerar_usuarios
+# e é o plano usado quando nenhum esquema é informado (ver obter_plano)
+ESQUEMAS = {
+    "padrao": {
+        "campos": [
+            {"nome": "nome", "tipo": "nome"},
+            {"nome": "login", "tipo": "login"},
+            {"nome": "cpf", "tipo": "cpf"},
+            {"nome": "celular", "tipo": "celular"},
+            {"nome": "celular_sem_formatacao", "tipo": "celular", "formatado": False},
+        ]
+    },
+    "completo": {
+        "campos": [
+            {"nome": "nome", "tipo": "nome"},
+            {"nome": "login", "tipo": "login"},
+            {"nome": "email", "tipo": "email", "de": "login"},
+            {"nome": "cpf", "tipo": "cpf", "formatado": True},
+            {"nome": "rg", "tipo": "padrao", "padrao": "##.###.###-#"},
+            {"nome": "nascimento", "tipo": "data", "minimo": "1950-01-01", "maximo": "2006-12-31"},
+            {"nome": "cep", "tipo": "padrao", "padrao": "#####-###"},
+            {"nome": "celular", "tipo": "celular"},
+        ]
+    },
+}
+
+# Função para ler um esquema de um arquivo JSON ou YAML
+def carregar_esquema(caminho):
+    """Lê o esquema de `caminho` (.json, .yaml ou .yml; YAML requer o PyYAML instalado)."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    with open(caminho, encoding="utf-8") as arquivo:
+        if extensao in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Esquemas em YAML requerem o PyYAML instalado (pip install pyyaml).") from None
+            return yaml.safe_load(arquivo)
+        return json.load(arquivo)
+
+# Função para obter um esquema pelo nome embutido ou pelo caminho do arquivo
+def obter_esquema(nome_ou_caminho):
+    if nome_ou_caminho in ESQUEMAS:
+        return ESQUEMAS[nome_ou_caminho]
+    if not os.path.exists(nome_ou_caminho):
+        raise ValueError(f"Esquema {nome_ou_caminho!r} não encontrado (embutidos: {', '.join(ESQUEMAS)}).")
+    return carregar_esquema(nome_ou_caminho)
+
+# Função para remover acentos e deixar só caracteres aceitos num e-mail
+def normalizar_ascii(texto):
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return "".join(c for c in sem_acentos.lower() if c.isalnum() or c in "._-@")
+
+# Função para listar os campos referenciados por um modelo "{campo}..."
+def _campos_do_modelo(modelo):
+    return [campo for _, campo, _, _ in string.Formatter().parse(modelo) if campo is not None]
+
+# Função para converter um modelo com nomes em um com posições ("{login}@x" -> "{0}@x")
+def _modelo_posicional(modelo, campos):
+    partes = []
+    for literal, campo, especificacao, conversao in string.Formatter().parse(modelo):
+        partes.append(literal.replace("{", "{{").replace("}", "}}"))
+        if campo is not None:
+            partes.append("{" + str(campos.index(campo)) + (f"!{conversao}" if conversao else "")
+                          + (f":{especificacao}" if especificacao else "") + "}")
+    return "".join(partes)
+
+# Função para ler uma data ISO de uma opção do esquema
+def _ler_data(campo, chave, padrao):
+    try:
+        return datetime.date.fromisoformat(campo.get(chave, padrao))
+    except (TypeError, ValueError):
+        raise ValueError(f"Campo {campo['nome']!r}: {chave} deve ser uma data AAAA-MM-DD.") from None
+
+# Funções que compilam cada tipo de campo: recebem o campo e o vocabulário e retornam
+# (dependências, função(n, rng, colunas) -> lista de valores)
+def _compilar_base(campo, vocabulario):
+    tipo = campo["tipo"]
+    if tipo == "celular":
+        coluna = "celular" if campo.get("formatado", True) else "celular_sem_formatacao"
+        return ["<base>"], lambda n, rng, colunas: colunas["<base>"][coluna]
+    if tipo == "cpf" and campo.get("formatado", False):
+        return ["<base>"], lambda n, rng, colunas: [f"{c[:3]}.{c[3:6]}.{c[6:9]}-{c[9:]}" for c in colunas["<base>"]["cpf"]]
+    return ["<base>"], lambda n, rng, colunas: colunas["<base>"][tipo]
+
+def _compilar_vocabulario(campo, vocabulario):
+    tabela = campo.get("tabela")
+    if tabela not in ("M", "F", "N", "sobrenomes", "adjetivos", "ddds"):
+        raise ValueError(f"Campo {campo['nome']!r}: tabela deve ser M, F, N, sobrenomes, adjetivos ou ddds.")
+    valores = vocabulario.valores(tabela) if vocabulario is not None else ()
+    if not valores:
+        raise ValueError(f"Campo {campo['nome']!r}: a tabela {tabela!r} está vazia no vocabulário.")
+
+    def gerar(n, rng, colunas):
+        return dados.selecionar(valores, vocabulario.sortear_indices(tabela, n, rng))
+    return [], gerar
+
+def _compilar_escolha(campo, vocabulario):
+    valores = tuple(campo.get("valores") or ())
+    if not valores:
+        raise ValueError(f"Campo {campo['nome']!r}: informe a lista de valores.")
+    pesos = campo.get("pesos") or [1] * len(valores)
+    if len(pesos) != len(valores):
+        raise ValueError(f"Campo {campo['nome']!r}: valores e pesos devem ter o mesmo tamanho.")
+    tabela = amostragem.TabelaAlias.construir(pesos)
+
+    def gerar(n, rng, colunas):
+        return [valores[i] for i in tabela.sortear_lote(n, rng)]
+    return [], gerar
+
+def _compilar_inteiro(campo, vocabulario):
+    minimo, maximo = int(campo.get("minimo", 0)), int(campo.get("maximo", 100))
+    if maximo < minimo:
+        raise ValueError(f"Campo {campo['nome']!r}: maximo menor que minimo.")
+    intervalo = range(minimo, maximo + 1)
+    return [], lambda n, rng, colunas: rng.choices(intervalo, k=n)
+
+def _compilar_data(campo, vocabulario):
+    minimo = _ler_data(campo, "minimo", "1950-01-01").toordinal()
+    maximo = _ler_data(campo, "maximo", "2006-12-31").toordinal()
+    if maximo < minimo:
+        raise ValueError(f"Campo {campo['nome']!r}: maximo anterior ao minimo.")
+    intervalo = range(minimo, maximo + 1)
+    formato = campo.get("formato")
+    para_data = datetime.date.fromordinal
+
+    def gerar(n, rng, colunas):
+        if formato is None:
+            return [para_data(dia).isoformat() for dia in rng.choices(intervalo, k=n)]
+        return [para_data(dia).strftime(formato) for dia in rng.choices(intervalo, k=n)]
+    return [], gerar
+
+def _compilar_padrao(campo, vocabulario):
+    padrao = campo.get("padrao")
+    if not padrao or "#" not in padrao:
+        raise ValueError(f"Campo {campo['nome']!r}: o padrão deve ter ao menos um '#' (dígito).")
+    # Cada "#" vira um campo posicional preenchido por um dígito; os dígitos são sorteados em grupos de até 9
+    modelo = padrao.replace("{", "{{").replace("}", "}}").replace("#", "{}")
+    total_digitos = padrao.count("#")
+    grupos = [min(9, total_digitos - inicio) for inicio in range(0, total_digitos, 9)]
+
+    def gerar(n, rng, colunas):
+        if len(grupos) == 1:
+            largura = grupos[0]
+            return [modelo.format(*f"{v:0{largura}d}") for v in rng.choices(range(10 ** largura), k=n)]
+        sorteios = [rng.choices(range(10 ** largura), k=n) for largura in grupos]
+        digitos = ["".join(f"{v:0{largura}d}" for v, largura in zip(valores, grupos)) for valores in zip(*sorteios)]
+        return [modelo.format(*d) for d in digitos]
+    return [], gerar
+
+def _compilar_modelo(campo, vocabulario):
+    modelo = campo.get("modelo")
+    if not modelo:
+        raise ValueError(f"Campo {campo['nome']!r}: informe o modelo, ex.: \"{{login}}@empresa.com.br\".")
+    dependencias = list(dict.fromkeys(_campos_do_modelo(modelo)))
+    posicional = _modelo_posicional(modelo, dependencias)
+    ascii_ = campo.get("ascii", False)
+
+    def gerar(n, rng, colunas):
+        valores = [posicional.format(*registro) for registro in zip(*(colunas[d] for d in dependencias))]
+        return [normalizar_ascii(v) for v in valores] if ascii_ else valores
+    return dependencias, gerar
+
+def _compilar_email(campo, vocabulario):
+    origem = campo.get("de", "login")
+    dominios = tuple(campo.get("dominios") or DOMINIOS_EMAIL)
+    tabela = amostragem.TabelaAlias.construir(campo.get("pesos") or [1] * len(dominios))
+
+    def gerar(n, rng, colunas):
+        # O usuário é normalizado uma vez por valor distinto (logins e nomes se repetem muito)
+        normalizados = {v: normalizar_ascii(v.replace(" ", ".")) for v in set(colunas[origem])}
+        return [f"{normalizados[v]}@{dominios[i]}" for v, i in zip(colunas[origem], tabela.sortear_lote(n, rng))]
+    return [origem], gerar
+
+_COMPILADORES = {
+    "nome": _compilar_base, "login": _compilar_base, "cpf": _compilar_base, "celular": _compilar_base,
+    "vocabulario": _compilar_vocabulario, "escolha": _compilar_escolha, "inteiro": _compilar_inteiro,
+    "data": _compilar_data, "padrao": _compilar_padrao, "modelo": _compilar_modelo, "email": _compilar_email,
+}
+
+# Função para ordenar os campos de forma que cada um venha depois das suas dependências
+def _ordenar(campos, dependencias):
+    """Ordem topológica estável (a do esquema, quando possível); levanta ValueError em ciclos."""
+    ordem, visitando, feitos = [], set(), set()
+
+    def visitar(nome, caminho):
+        if nome in feitos:
+            return
+        if nome in visitando:
+            raise ValueError(f"Esquema inválido: dependência circular em {' -> '.join(caminho + [nome])}.")
+        visitando.add(nome)
+        for dependencia in dependencias[nome]:
+            if dependencia != "<base>":
+                visitar(dependencia, caminho + [nome])
+        visitando.discard(nome)
+        feitos.add(nome)
+        ordem.append(nome)
+
+    for nome in campos:
+        visitar(nome, [])
+    return ordem
+
+# Classe com o plano compilado de um esquema
+class PlanoEsquema:
+    """Plano de geração em lote: os campos já validados, em ordem de dependência.
+
+    Os campos dos tipos base (nome, login, cpf, celular) vêm de um único dados.sortear_usuarios
+    por lote, feito antes dos demais; cada outro campo é uma passada sobre a coluna inteira.
+    Tabelas de sorteio e modelos são preparados na compilação, não por registro.
+    """
+
+    def __init__(self, colunas, etapas, usa_base, genero, vocabulario, restricoes):
+        self.colunas = colunas
+        self.etapas = etapas
+        self.usa_base = usa_base
+        self.genero = genero
+        self.vocabulario = vocabulario
+        self.restricoes = restricoes
+
+    def gerar(self, n, rng=None):
+        """Gera n registros e retorna um dicionário com as colunas visíveis, na ordem do esquema."""
+        rng = rng if rng is not None else random
+        colunas = {}
+        if self.usa_base:
+            sorteios = dados.sortear_usuarios(n, self.genero, rng, self.vocabulario)
+            colunas["<base>"] = dados.montar_usuarios(sorteios, self.vocabulario)
+        for nome, gerar in self.etapas:
+            valores = gerar(n, rng, colunas)
+            tamanho_maximo, nulos = self.restricoes.get(nome, (None, 0))
+            if tamanho_maximo is not None:
+                valores = [v[:tamanho_maximo] for v in valores]
+            if nulos:
+                valores = [v if sorteio >= nulos else "" for v, sorteio in zip(valores, [rng.random() for _ in range(n)])]
+            colunas[nome] = valores
+        return {coluna: colunas[coluna] for coluna in self.colunas}
+
+    def gerar_lotes(self, total, tamanho_lote=10000, semente=None, inicio=0):
+        """Gera os registros [inicio, total) nos lotes de dados.planejar_lotes.
+
+        Com `semente`, cada lote usa dados.derivar_semente(semente, índice do lote): a mesma
+        saída de paralelo.gerar_lotes_paralelo, qualquer que seja o número de processos.
+        """
+        for indice, n, descartar in dados.planejar_lotes(total, tamanho_lote, inicio):
+            rng = random.Random(dados.derivar_semente(semente, indice)) if semente is not None else None
+            lote = self.gerar(n, rng)
+            yield dados.fatiar_lote(lote, descartar) if descartar else lote
+
+# Função para validar as opções tamanho_maximo e nulos de um campo
+def _ler_restricoes(campo):
+    """Retorna (tamanho_maximo, nulos) do campo, levantando ValueError se não valem para o tipo."""
+    nome, tamanho_maximo = campo["nome"], campo.get("tamanho_maximo")
+    try:
+        nulos = float(campo.get("nulos", 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"Campo {nome!r}: nulos deve ser um número entre 0 e 1.") from None
+    if not 0 <= nulos <= 1:
+        raise ValueError(f"Campo {nome!r}: nulos deve estar entre 0 e 1.")
+    if tamanho_maximo is not None and (isinstance(tamanho_maximo, bool) or not isinstance(tamanho_maximo, int)
+                                       or tamanho_maximo < 1):
+        raise ValueError(f"Campo {nome!r}: tamanho_maximo deve ser um inteiro positivo.")
+    if campo["tipo"] in TIPOS_NUMERICOS and (tamanho_maximo is not None or nulos):
+        raise ValueError(f"Campo {nome!r}: tamanho_maximo e nulos só valem para campos de texto, "
+                         f"não para o tipo {campo['tipo']!r}.")
+    return tamanho_maximo, nulos
+
+# Função para compilar um esquema num plano de geração
+def compilar(esquema, genero=None, vocabulario=None):
+    """Valida o esquema (dicionário com a lista "campos") e retorna o PlanoEsquema.
+
+    Cada campo tem "nome", "tipo" (ver TIPOS) e as opções do tipo; em qualquer campo,
+    "oculto" o usa só como dependência e, nos campos de texto (todos menos TIPOS_NUMERICOS),
+    "tamanho_maximo" corta o valor e "nulos" (0 a 1) é a fração de valores vazios. Erros do esquema levantam ValueError com o campo e o motivo.
+    """
+    if not isinstance(esquema, dict) or not isinstance(esquema.get("campos"), list) or not esquema["campos"]:
+        raise ValueError("Esquema inválido: informe a lista \"campos\".")
+    vocabulario = vocabulario if vocabulario is not None else dados.obter_vocabulario()
+
+    campos, geradores, dependencias, restricoes = {}, {}, {}, {}
+    for campo in esquema["campos"]:
+        if not isinstance(campo, dict) or not campo.get("nome") or campo.get("tipo") not in TIPOS:
+            raise ValueError(f"Esquema inválido: campo {campo!r} precisa de \"nome\" e de um \"tipo\" entre {', '.join(TIPOS)}.")
+        nome = campo["nome"]
+        if nome in campos:
+            raise ValueError(f"Esquema inválido: campo {nome!r} repetido.")
+        campos[nome] = campo
+        dependencias[nome], geradores[nome] = _COMPILADORES[campo["tipo"]](campo, vocabulario)
+        restricoes[nome] = _ler_restricoes(campo)
+
+    for nome, lista in dependencias.items():
+        for dependencia in lista:
+            if dependencia != "<base>" and dependencia not in campos:
+                raise ValueError(f"Campo {nome!r}: depende de {dependencia!r}, que não está no esquema.")
+
+    ordem = _ordenar(list(campos), dependencias)
+    colunas = tuple(nome for nome in campos if not campos[nome].get("oculto"))
+    if not colunas:
+        raise ValueError("Esquema inválido: todos os campos estão ocultos.")
+    usa_base = any("<base>" in dependencias[nome] for nome in ordem)
+    restricoes = {nome: valor for nome, valor in restricoes.items() if valor != (None, 0)}
+    return PlanoEsquema(colunas, [(nome, geradores[nome]) for nome in ordem], usa_base, genero, vocabulario, restricoes)
+
+# Planos dos esquemas embutidos já compilados, por (nome, gênero)
+_planos = {}
+
+# Função para obter o plano compilado de um esquema embutido
+def obter_plano(nome="padrao", genero=None):
+    """Retorna o PlanoEsquema do esquema embutido `nome`, compilado uma vez por processo.
+
+    Recompila quando dados.obter_vocabulario() troca o vocabulário (o banco mudou), já que
+    os índices sorteados só valem para o vocabulário da compilação.
+    """
+    vocabulario = dados.obter_vocabulario()
+    plano = _planos.get((nome, genero))
+    if plano is None or plano.vocabulario is not vocabulario:
+        plano = compilar(ESQUEMAS[nome], genero, vocabulario)
+        _planos[(nome, genero)] = plano
+    return plano
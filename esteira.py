@@ -0,0 +1,182 @@
+import os
+import bz2
+import sys
+import gzip
+import lzma
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from dados import COLUNAS_USUARIO
+from exportar import codificar_csv, codificar_jsonl
+from instrumentacao import etapa
+
+# Compressões aceitas e a extensão de arquivo de cada uma
+COMPRESSOES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+# Formatos de texto que a esteira sabe codificar
+FORMATOS_TEXTO = ("csv", "jsonl")
+# Blocos em espera entre a geração e a escrita (limita a memória)
+PROFUNDIDADE_PADRAO = 4
+# Tamanho do buffer de escrita: o arquivo recebe escritas sequenciais deste tamanho
+TAMANHO_ESCRITA_PADRAO = 8 * 1024 * 1024
+# Marca de fim na fila de blocos
+_FIM = object()
+
+# Função para deduzir a compressão pela extensão do arquivo de saída
+def compressao_pela_extensao(destino):
+    """Retorna "gzip", "bz2" ou "xz" para destinos terminados em .gz, .bz2 ou .xz (None nos demais)."""
+    for compressao, extensao in COMPRESSOES.items():
+        if destino and destino.lower().endswith(extensao):
+            return compressao
+    return None
+
+# Função para comprimir um bloco como um membro independente
+def comprimir(conteudo, compressao, nivel=None):
+    """Comprime `conteudo` num membro (stream) completo do formato.
+
+    Membros concatenados formam um arquivo válido para gzip -d, bzip2 -d, xz -d e para os
+    módulos gzip, bz2 e lzma, então cada bloco pode ser comprimido num processo diferente.
+    """
+    if compressao == "gzip":
+        # mtime=0: a mesma entrada gera sempre os mesmos bytes
+        return gzip.compress(conteudo, compresslevel=6 if nivel is None else nivel, mtime=0)
+    if compressao == "bz2":
+        return bz2.compress(conteudo, 9 if nivel is None else nivel)
+    if compressao == "xz":
+        return lzma.compress(conteudo, preset=nivel)
+    return conteudo
+
+# Função para codificar um lote no formato de texto pedido, já em bytes
+def codificar(lote, formato, colunas=COLUNAS_USUARIO, cabecalho=False):
+    if formato == "csv":
+        return codificar_csv(lote, colunas, cabecalho).encode("utf-8")
+    return codificar_jsonl(lote, colunas).encode("utf-8")
+
+# Função executada nos processos da esteira: codifica e comprime um lote
+def codificar_e_comprimir(lote, formato, colunas, cabecalho, compressao, nivel):
+    return comprimir(codificar(lote, formato, colunas, cabecalho), compressao, nivel)
+
+# Classe que junta os blocos em escritas grandes e sequenciais
+class EscritorSequencial:
+    """Copia os blocos para um buffer pré-alocado de `tamanho` bytes e só escreve quando ele enche.
+
+    Blocos maiores que o buffer vão direto para o arquivo, sem cópia.
+    """
+
+    def __init__(self, arquivo, tamanho=TAMANHO_ESCRITA_PADRAO):
+        self.arquivo = arquivo
+        self._buffer = bytearray(tamanho)
+        self._visao = memoryview(self._buffer)
+        self._posicao = 0
+
+    def escrever(self, conteudo):
+        tamanho = len(conteudo)
+        if self._posicao + tamanho > len(self._buffer):
+            self.descarregar()
+            if tamanho >= len(self._buffer):
+                self.arquivo.write(conteudo)
+                return
+        self._visao[self._posicao:self._posicao + tamanho] = conteudo
+        self._posicao += tamanho
+
+    def descarregar(self):
+        if self._posicao:
+            self.arquivo.write(self._visao[:self._posicao])
+            self._posicao = 0
+
+# Função para colocar um item na fila sem travar se a escrita já desistiu
+def _colocar(fila, item, parar):
+    while not parar.is_set():
+        try:
+            fila.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+# Função para abrir o destino binário (arquivo ou saída padrão)
+def _abrir_destino_binario(destino):
+    if destino in (None, "-"):
+        sys.stdout.flush()
+        return sys.stdout.buffer, False
+    return open(destino, "wb"), True
+
+# Função para exportar lotes em CSV ou JSON Lines numa esteira de etapas sobrepostas
+def exportar_em_esteira(lotes, formato, destino="-", colunas=COLUNAS_USUARIO, compressao=None, processos=1,
+                        nivel=None, profundidade=PROFUNDIDADE_PADRAO, tamanho_escrita=TAMANHO_ESCRITA_PADRAO):
+    """Escreve os lotes em `destino` e retorna o número de registros escritos.
+
+    Uma thread consome `lotes` (a geração) e codifica cada lote; a thread chamadora comprime
+    (com `compressao`: "gzip", "bz2" ou "xz") e escreve. Com `processos` > 1 (0 = um por
+    núcleo), a codificação e a compressão de cada lote vão para um pool de processos, em
+    paralelo, e os blocos são escritos na ordem dos lotes. As filas entre as etapas têm no
+    máximo `profundidade` blocos (ou 2 por processo), então a memória não depende do total.
+    Cada lote comprimido é um membro independente do arquivo; a escrita passa por um buffer
+    de `tamanho_escrita` bytes. Sem compressão, a saída é a mesma de exportar_csv/exportar_jsonl.
+    """
+    if formato not in FORMATOS_TEXTO:
+        raise ValueError(f"Formato inválido para a esteira: {formato!r} (use {' ou '.join(FORMATOS_TEXTO)}).")
+    if compressao is not None and compressao not in COMPRESSOES:
+        raise ValueError(f"Compressão inválida: {compressao!r} (use uma de {', '.join(COMPRESSOES)}).")
+    processos = processos if processos != 0 else (os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(processos) if processos > 1 else None
+    profundidade = max(profundidade, 2 * processos)
+    blocos = queue.Queue(profundidade)
+    parar = threading.Event()
+
+    def enviar(lote, cabecalho):
+        n = len(lote[colunas[0]])
+        if pool is not None:
+            bloco = pool.submit(codificar_e_comprimir, lote, formato, colunas, cabecalho, compressao, nivel)
+        else:
+            with etapa("exportar.codificacao", n):
+                bloco = codificar(lote, formato, colunas, cabecalho)
+        return _colocar(blocos, (n, bloco), parar)
+
+    def produzir():
+        try:
+            cabecalho = formato == "csv"
+            for lote in lotes:
+                if not enviar(lote, cabecalho):
+                    return
+                cabecalho = False
+            # Sem nenhum lote, o CSV ainda leva o cabeçalho
+            if cabecalho and not enviar({coluna: [] for coluna in colunas}, True):
+                return
+        except BaseException as e:
+            _colocar(blocos, (None, e), parar)
+            return
+        _colocar(blocos, _FIM, parar)
+
+    arquivo, deve_fechar = _abrir_destino_binario(destino)
+    escritor = EscritorSequencial(arquivo, tamanho_escrita)
+    produtor = threading.Thread(target=produzir, name="esteira-exportacao", daemon=True)
+    total = 0
+    try:
+        produtor.start()
+        while True:
+            item = blocos.get()
+            if item is _FIM:
+                break
+            n, bloco = item
+            if n is None:
+                raise bloco
+            if pool is not None:
+                bloco = bloco.result()
+            elif compressao is not None:
+                with etapa("exportar.compressao", n):
+                    bloco = comprimir(bloco, compressao, nivel)
+            with etapa("exportar.escrita", n):
+                escritor.escrever(bloco)
+            total += n
+        escritor.descarregar()
+    finally:
+        parar.set()
+        produtor.join()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if deve_fechar:
+            arquivo.close()
+        else:
+            arquivo.flush()
+    return total
@@ -0,0 +1,237 @@
+import io
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+import logging
+
+from dados import COLUNAS_USUARIO, get_db_path
+from instrumentacao import etapa
+
+# Banco de saída padrão para os usuários gerados (relativo à pasta do banco de nomes)
+OUTPUT_DATABASE_NAME = os.path.join('output', 'nomes.db')
+
+# Formatos de exportação suportados
+FORMATOS = ("csv", "jsonl", "sqlite")
+
+# Função para abrir o destino de texto (arquivo ou saída padrão)
+def _abrir_destino_texto(destino):
+    """Retorna (arquivo, deve_fechar) para o caminho informado, ou a saída padrão para "-"."""
+    if destino in (None, "-"):
+        return sys.stdout, False
+    return open(destino, "w", encoding="utf-8", newline=""), True
+
+# Função para exportar lotes de usuários em CSV
+def exportar_csv(lotes, destino="-", colunas=COLUNAS_USUARIO):
+    """Escreve as `colunas` dos lotes em CSV com cabeçalho e retorna o número de registros escritos."""
+    arquivo, deve_fechar = _abrir_destino_texto(destino)
+    total = 0
+    try:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(colunas)
+        for lote in lotes:
+            valores = [lote[coluna] for coluna in colunas]
+            with etapa("exportar.escrita", len(valores[0])):
+                escritor.writerows(zip(*valores))
+            total += len(valores[0])
+    finally:
+        if deve_fechar:
+            arquivo.close()
+    return total
+
+# Função para codificar um lote em CSV
+def codificar_csv(lote, colunas=COLUNAS_USUARIO, cabecalho=False):
+    """Retorna o lote como texto CSV (o mesmo de exportar_csv), com a linha de cabeçalho se `cabecalho`."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if cabecalho:
+        escritor.writerow(colunas)
+    escritor.writerows(zip(*(lote[coluna] for coluna in colunas)))
+    return buffer.getvalue()
+
+# Codificador JSON compartilhado (sem escapar acentos)
+_codificar_json = json.JSONEncoder(ensure_ascii=False).encode
+
+# Função para codificar um lote em JSON Lines
+def codificar_jsonl(lote, colunas=COLUNAS_USUARIO):
+    """Retorna o lote como texto JSON Lines (um objeto por linha, terminado em quebra de linha; vazio se não houver linhas)."""
+    valores = [lote[coluna] for coluna in colunas]
+    linhas = [_codificar_json(dict(zip(colunas, registro))) for registro in zip(*valores)]
+    return "\n".join(linhas) + "\n" if linhas else ""
+
+# Função para exportar lotes de usuários em JSON Lines
+def exportar_jsonl(lotes, destino="-", colunas=COLUNAS_USUARIO):
+    """Escreve um objeto JSON (com as `colunas`) por linha e retorna o número de registros escritos."""
+    arquivo, deve_fechar = _abrir_destino_texto(destino)
+    total = 0
+    try:
+        for lote in lotes:
+            n = len(lote[colunas[0]])
+            with etapa("exportar.escrita", n):
+                arquivo.write(codificar_jsonl(lote, colunas))
+            total += n
+    finally:
+        if deve_fechar:
+            arquivo.close()
+    return total
+
+# Perfis de PRAGMAs para a carga em SQLite
+PERFIS_SQLITE = {
+    # Carga máxima: sem journal nem fsync (um travamento no meio da carga pode corromper o arquivo)
+    "rapido": (
+        "PRAGMA journal_mode = OFF",
+        "PRAGMA synchronous = OFF",
+        "PRAGMA locking_mode = EXCLUSIVE",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -262144",
+        "PRAGMA threads = 4",
+    ),
+    # Carga segura para retomar depois de uma interrupção
+    "seguro": (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -262144",
+        "PRAGMA threads = 4",
+    ),
+}
+# Índices criados depois da carga: nome -> (coluna, comando)
+INDICES_USUARIOS = {
+    "idx_usuarios_cpf": ("cpf", "CREATE INDEX IF NOT EXISTS idx_usuarios_cpf ON usuarios (cpf)"),
+    "idx_usuarios_login": ("login", "CREATE INDEX IF NOT EXISTS idx_usuarios_login ON usuarios (login)"),
+}
+
+# Função para obter o caminho padrão do banco de saída
+def caminho_saida_padrao():
+    """Retorna o caminho de output/nomes.db ao lado do banco de nomes."""
+    return os.path.join(os.path.dirname(get_db_path()), OUTPUT_DATABASE_NAME)
+
+# Função para criar a tabela de usuários no banco de saída
+def _criar_tabela_usuarios(conn, colunas=COLUNAS_USUARIO):
+    definicoes = ", ".join(f'"{coluna}" TEXT NOT NULL' for coluna in colunas)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY, {definicoes})")
+
+# Função para verificar se o banco de saída já tem a tabela de usuários
+def _tabela_usuarios_existe(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usuarios'").fetchone() is not None
+
+# Função para contar os usuários já gravados (usada para retomar uma carga)
+def contar_usuarios_sqlite(destino=None):
+    """Retorna quantos usuários já existem na tabela `usuarios` do banco de saída (0 se não existir).
+
+    Erros do SQLite (ex.: o arquivo não é um banco) levantam ValueError com o caminho.
+    """
+    destino = destino if destino not in (None, "-") else caminho_saida_padrao()
+    if not os.path.exists(destino):
+        return 0
+    conn = sqlite3.connect(destino)
+    try:
+        # Só lê: criar a tabela aqui fixaria as colunas padrão antes da carga (ex.: com --esquema)
+        if not _tabela_usuarios_existe(conn):
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    except sqlite3.Error as e:
+        raise ValueError(f"Não foi possível ler os usuários de '{destino}': {e}") from e
+    finally:
+        conn.close()
+
+# Função para ler CPFs e logins já gravados, em blocos
+def ler_cpfs_logins_sqlite(destino=None, tamanho_bloco=100000):
+    """Gera listas de (cpf, login) já presentes no banco de saída, sem carregá-las todas de uma vez.
+
+    Erros do SQLite (arquivo que não é um banco, tabela sem as colunas) levantam ValueError.
+    """
+    destino = destino if destino not in (None, "-") else caminho_saida_padrao()
+    if not os.path.exists(destino):
+        return
+    conn = sqlite3.connect(destino)
+    try:
+        if not _tabela_usuarios_existe(conn):
+            return
+        cursor = conn.execute("SELECT cpf, login FROM usuarios ORDER BY id")
+        while True:
+            linhas = cursor.fetchmany(tamanho_bloco)
+            if not linhas:
+                break
+            yield linhas
+    except sqlite3.Error as e:
+        raise ValueError(f"Não foi possível ler os CPFs e logins de '{destino}': {e}") from e
+    finally:
+        conn.close()
+
+# Função para recriar os índices de cpf e login removidos antes da carga
+def _recriar_indices(conn, indices):
+    inicio = time.perf_counter()
+    with etapa("exportar.indices"):
+        for criar_indice in indices.values():
+            conn.execute(criar_indice)
+    if indices:
+        logging.info(f"Índices {', '.join(indices)} criados em {time.perf_counter() - inicio:.2f}s.")
+
+# Função para gravar lotes de usuários numa tabela SQLite
+def exportar_sqlite(lotes, destino=None, perfil="rapido", linhas_por_transacao=500000, colunas=COLUNAS_USUARIO):
+    """Insere as `colunas` dos lotes na tabela `usuarios` do banco de saída (padrão: output/nomes.db).
+
+    As linhas são acrescentadas às existentes com executemany em transações de até
+    `linhas_por_transacao` linhas, usando os PRAGMAs do `perfil` ("rapido" ou "seguro").
+    Os índices de cpf e login (se existirem essas colunas) são removidos antes da carga e
+    recriados ao final, também quando a carga falha.
+    """
+    if perfil not in PERFIS_SQLITE:
+        raise ValueError(f"Perfil inválido: {perfil!r} (use um de {', '.join(PERFIS_SQLITE)}).")
+    destino = destino if destino not in (None, "-") else caminho_saida_padrao()
+    pasta = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta, exist_ok=True)
+
+    conn = sqlite3.connect(destino, isolation_level=None)
+    total = 0
+    indices = {}
+    try:
+        for pragma in PERFIS_SQLITE[perfil]:
+            conn.execute(pragma)
+        _criar_tabela_usuarios(conn, colunas)
+        indices = {nome: criar for nome, (coluna, criar) in INDICES_USUARIOS.items() if coluna in colunas}
+        for nome_indice in indices:
+            conn.execute(f"DROP INDEX IF EXISTS {nome_indice}")
+
+        nomes_colunas = ", ".join(f'"{coluna}"' for coluna in colunas)
+        inserir = f"INSERT INTO usuarios ({nomes_colunas}) VALUES ({', '.join('?' * len(colunas))})"
+        pendentes = 0
+        conn.execute("BEGIN")
+        for lote in lotes:
+            valores = [lote[coluna] for coluna in colunas]
+            with etapa("exportar.escrita", len(valores[0])):
+                conn.executemany(inserir, zip(*valores))
+            pendentes += len(valores[0])
+            if pendentes >= linhas_por_transacao:
+                conn.execute("COMMIT")
+                total += pendentes
+                pendentes = 0
+                conn.execute("BEGIN")
+        conn.execute("COMMIT")
+        total += pendentes
+        _recriar_indices(conn, indices)
+        indices = {}
+    finally:
+        try:
+            # Sem journal (perfil "rapido") não há ROLLBACK confiável: as linhas já inseridas ficam
+            # (e contam para o --resume), e os índices removidos antes da carga são recriados
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+            if indices:
+                _recriar_indices(conn, indices)
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao recriar os índices após a falha da carga: {e}")
+        finally:
+            conn.close()
+    return total
+
+# Função para exportar lotes no formato escolhido
+def exportar(lotes, formato, destino="-", **opcoes):
+    """Despacha os lotes para o exportador do formato informado (opções extras vão para ele)."""
+    exportadores = {"csv": exportar_csv, "jsonl": exportar_jsonl, "sqlite": exportar_sqlite}
+    if formato not in exportadores:
+        raise ValueError(f"Formato inválido: {formato!r} (use um de {', '.join(FORMATOS)}).")
+    return exportadores[formato](lotes, destino, **opcoes)
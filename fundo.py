@@ -0,0 +1,70 @@
+import os
+import sys
+import logging
+
+# Cor de fundo da janela, usada para pré-misturar a imagem (a imagem final é opaca)
+COR_FUNDO = (0x33, 0x33, 0x33)
+# Opacidade da imagem de fundo da janela principal
+OPACIDADE_FUNDO = 0.1
+# Imagem de fundo pré-calculada distribuída junto do executável (gerada pelo setup_cx.py)
+FUNDO_PRECALCULADO = "assets/background_fundo.png"
+
+# Função para obter a pasta de cache do usuário
+def pasta_cache():
+    """Retorna a pasta de cache do aplicativo (LOCALAPPDATA no Windows, XDG_CACHE_HOME/~/.cache nos demais)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "GeradorDestiny")
+
+# Função para obter o caminho do fundo em cache para uma imagem e opacidade
+def caminho_cache_fundo(imagem_path, opacidade):
+    """O nome do arquivo leva o mtime e o tamanho da imagem original e a opacidade: mudou um deles, muda o cache."""
+    estado = os.stat(imagem_path)
+    nome = os.path.splitext(os.path.basename(imagem_path))[0]
+    return os.path.join(pasta_cache(), f"{nome}-{estado.st_mtime_ns:x}-{estado.st_size:x}-{round(opacidade * 1000)}.png")
+
+# Função para pré-misturar a imagem de fundo com a cor da janela
+def gerar_fundo(imagem_path, opacidade, destino):
+    """Mistura a imagem sobre COR_FUNDO na opacidade pedida e grava um PNG opaco em `destino`.
+
+    É o único ponto que usa o PIL, importado aqui para não pesar na abertura da janela.
+    """
+    from PIL import Image
+
+    with Image.open(imagem_path) as imagem:
+        imagem = imagem.convert("RGB")
+    fundo = Image.new("RGB", imagem.size, COR_FUNDO)
+    misturada = Image.blend(fundo, imagem, opacidade)
+
+    pasta = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta, exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    misturada.save(temporario, format="PNG", compress_level=1)
+    os.replace(temporario, destino)
+    return destino
+
+# Função para localizar (ou gerar) o PNG de fundo pronto para o Tk
+def obter_fundo(imagem_path, opacidade, precalculado=None):
+    """Retorna o caminho de um PNG já misturado para a imagem e opacidade, ou None se não houver como obtê-lo.
+
+    Ordem: cache do usuário, imagem pré-calculada distribuída (se não for mais antiga que a
+    original, ou sempre no executável congelado) e, por último, geração com o PIL.
+    """
+    if not os.path.exists(imagem_path):
+        logging.warning(f"Arquivo não encontrado: {imagem_path}")
+        return None
+
+    cache = caminho_cache_fundo(imagem_path, opacidade)
+    if os.path.exists(cache):
+        return cache
+
+    if precalculado and os.path.exists(precalculado):
+        if getattr(sys, "frozen", False) or os.path.getmtime(precalculado) >= os.path.getmtime(imagem_path):
+            return precalculado
+
+    try:
+        return gerar_fundo(imagem_path, opacidade, cache)
+    except ImportError:
+        logging.warning("Pillow não instalado: a imagem de fundo não será exibida.")
+    except OSError as e:
+        logging.warning(f"Não foi possível gerar a imagem de fundo: {e}")
+    return None
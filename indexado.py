@@ -0,0 +1,156 @@
+import random
+import logging
+import functools
+
+import cpf
+import dados
+from dados import COLUNAS_USUARIO
+
+np = cpf.np
+
+# Campos sorteados de cada registro; cada um tem a sua própria sequência de hashes
+CAMPOS = ("nome", "sobrenome", "adjetivo", "sequencia", "ddd", "numero", "cpf")
+# Constantes do SplitMix64
+_INCREMENTO = 0x9E3779B97F4A7C15
+_MULTIPLICADOR_1 = 0xBF58476D1CE4E5B9
+_MULTIPLICADOR_2 = 0x94D049BB133111EB
+_MASCARA = (1 << 64) - 1
+# Converte os 53 bits altos de um hash num uniforme em [0, 1)
+_ESCALA_UNIFORME = 2.0 ** -53
+# Abaixo deste número de registros o caminho em inteiros Python é mais rápido que o NumPy
+MINIMO_VETORIZADO = 64
+
+# Função para derivar a chave de cada campo a partir da semente
+@functools.lru_cache(maxsize=64)
+def chaves_campos(semente):
+    """Retorna {campo: chave de 64 bits}; o hash do registro i no campo é misturar(chave + (i + 1) * incremento)."""
+    return {campo: dados.derivar_semente(semente, f"campo:{campo}") for campo in CAMPOS}
+
+# Função de mistura do SplitMix64 (finalizador), em inteiros Python
+def misturar(z):
+    z = ((z ^ (z >> 30)) * _MULTIPLICADOR_1) & _MASCARA
+    z = ((z ^ (z >> 27)) * _MULTIPLICADOR_2) & _MASCARA
+    return z ^ (z >> 31)
+
+# Função para calcular os hashes de um campo nos registros [inicio, fim)
+def hashes(chave, inicio, fim, vetorizado=False):
+    """Retorna os hashes de 64 bits do campo para os registros [inicio, fim) (array uint64 com `vetorizado`, lista sem)."""
+    if vetorizado:
+        with np.errstate(over="ignore"):
+            z = np.uint64(chave) + (np.arange(inicio + 1, fim + 1, dtype=np.uint64) * np.uint64(_INCREMENTO))
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(_MULTIPLICADOR_1)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(_MULTIPLICADOR_2)
+            return z ^ (z >> np.uint64(31))
+    return [misturar((chave + i * _INCREMENTO) & _MASCARA) for i in range(inicio + 1, fim + 1)]
+
+# Função para converter hashes em uniformes em [0, 1)
+def _uniformes(valores):
+    if not isinstance(valores, list):
+        return (valores >> np.uint64(11)).astype(np.float64) * _ESCALA_UNIFORME
+    return [(h >> 11) * _ESCALA_UNIFORME for h in valores]
+
+# Função para reduzir hashes a inteiros em [minimo, minimo + amplitude)
+def _intervalo(valores, minimo, amplitude):
+    if not isinstance(valores, list):
+        return ((valores % np.uint64(amplitude)).astype(np.int64) + minimo).tolist()
+    return [minimo + h % amplitude for h in valores]
+
+# Função para converter índices (array ou lista) em lista de ints
+def _lista(indices):
+    return indices.tolist() if np is not None and isinstance(indices, np.ndarray) else indices
+
+# Função para sortear (por hash) os campos dos registros [inicio, fim)
+def sortear_intervalo(semente, inicio, fim, genero=None, vocabulario=None):
+    """Retorna os sorteios dos registros [inicio, fim) no formato de dados.sortear_usuarios."""
+    vocabulario = vocabulario if vocabulario is not None else dados.obter_vocabulario()
+    n = max(0, fim - inicio)
+    chaves = chaves_campos(semente)
+    vetorizado = np is not None and n >= MINIMO_VETORIZADO
+
+    def campo(nome):
+        return hashes(chaves[nome], inicio, fim, vetorizado)
+
+    def indices(nome, chave_tabela):
+        return _lista(vocabulario.tabela(chave_tabela).indices(_uniformes(campo(nome))))
+
+    sorteios = dict.fromkeys(("indices_nomes", "indices_sobrenomes", "indices_adjetivos", "sequencias",
+                              "indices_ddds", "numeros"))
+    sorteios["n"], sorteios["genero"] = n, genero
+    if vocabulario is not None:
+        if vocabulario.nomes(genero):
+            sorteios["indices_nomes"] = indices("nome", genero)
+            if vocabulario.sobrenomes:
+                sorteios["indices_sobrenomes"] = indices("sobrenome", "sobrenomes")
+        if vocabulario.adjetivos:
+            sorteios["indices_adjetivos"] = indices("adjetivo", "adjetivos")
+        sorteios["sequencias"] = _intervalo(campo("sequencia"), 10, 990)
+        if vocabulario.ddds:
+            sorteios["indices_ddds"] = indices("ddd", "ddds")
+            sorteios["numeros"] = _intervalo(campo("numero"), 10000000, 90000000)
+    sorteios["bases_cpf"] = _intervalo(campo("cpf"), 0, 1000000000)
+    return sorteios
+
+# Função para gerar os registros [inicio, fim) de um conjunto de dados virtual
+def gerar_intervalo(semente, inicio, fim, genero=None, vocabulario=None):
+    """Gera os usuários de posição inicio..fim-1 do conjunto definido por `semente`, em colunas como dados.gerar_usuarios.
+
+    Cada campo do registro i vem de um hash sem estado de (semente, i, campo), então qualquer
+    registro ou intervalo é calculado direto, sem gerar os anteriores, em qualquer ordem e em
+    qualquer processo. O resultado depende também do vocabulário (mesmo banco, mesmos usuários)
+    e do gênero, mas não de como o intervalo é dividido.
+    """
+    vocabulario = vocabulario if vocabulario is not None else dados.obter_vocabulario()
+    return dados.montar_usuarios(sortear_intervalo(semente, inicio, fim, genero, vocabulario), vocabulario)
+
+# Função para calcular um único usuário do conjunto virtual
+def gerar_usuario_indice(semente, indice, genero=None):
+    """Retorna o usuário de posição `indice` (tupla na ordem de COLUNAS_USUARIO) em O(1)."""
+    lote = gerar_intervalo(semente, indice, indice + 1, genero)
+    return tuple(lote[coluna][0] for coluna in COLUNAS_USUARIO)
+
+# Função para gerar o conjunto virtual em lotes
+def gerar_lotes_indexados(total, genero=None, tamanho_lote=10000, semente=None, inicio=0):
+    """Gera os registros [inicio, total) do conjunto virtual em lotes, como PlanoEsquema.gerar_lotes.
+
+    O tamanho do lote não muda os registros: qualquer divisão (ou processo) produz a mesma saída.
+    """
+    if tamanho_lote <= 0:
+        raise ValueError("O tamanho do lote deve ser positivo.")
+    if semente is None:
+        semente = random.SystemRandom().getrandbits(63)
+        logging.info(f"Semente gerada para o conjunto indexado: {semente}")
+    for posicao in range(max(inicio, 0), total, tamanho_lote):
+        yield gerar_intervalo(semente, posicao, min(posicao + tamanho_lote, total), genero)
+
+# Classe que expõe o conjunto virtual como fonte de linhas (ex.: para a TabelaVirtual)
+class FonteIndexada:
+    """Fonte de `total` linhas calculadas sob demanda, em páginas de `tamanho_pagina` registros.
+
+    Só a última página lida fica em memória, então a tabela pode mostrar milhões de linhas
+    sem gerá-las antes.
+    """
+
+    def __init__(self, semente, total, colunas, genero=None, tamanho_pagina=256):
+        self.semente = semente
+        self.total = total
+        self.colunas = colunas
+        self.genero = genero
+        self.tamanho_pagina = tamanho_pagina
+        self._pagina = None
+        self._linhas = ()
+
+    def __len__(self):
+        return self.total
+
+    def linha(self, indice):
+        pagina = indice // self.tamanho_pagina
+        if pagina != self._pagina:
+            inicio = pagina * self.tamanho_pagina
+            lote = gerar_intervalo(self.semente, inicio, min(inicio + self.tamanho_pagina, self.total), self.genero)
+            self._linhas = list(zip(*(lote[coluna] for coluna in self.colunas)))
+            self._pagina = pagina
+        return self._linhas[indice - self._pagina * self.tamanho_pagina]
+
+    def lotes(self, tamanho_lote=10000):
+        """Gera o conjunto inteiro em lotes (para exportar)."""
+        return gerar_lotes_indexados(self.total, self.genero, tamanho_lote, self.semente)
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextlib
+
+# Variável de ambiente que liga a instrumentação (qualquer valor diferente de vazio e "0")
+VARIAVEL_AMBIENTE = "GERADOR_INSTRUMENTACAO"
+# Instrumentação ligada? Os pontos instrumentados só consultam esta flag quando desligada
+ATIVO = os.environ.get(VARIAVEL_AMBIENTE, "") not in ("", "0")
+
+# Tempos por etapa: nome -> [chamadas, registros, tempo total, maior tempo]
+_etapas = {}
+# Contadores livres: nome -> valor
+_contadores = {}
+_lock = threading.Lock()
+# Contexto vazio devolvido por etapa() com a instrumentação desligada
+_NULO = contextlib.nullcontext()
+
+# Classe do cronômetro usado por etapa() com a instrumentação ligada
+class _Cronometro:
+    __slots__ = ("nome", "registros", "inicio")
+
+    def __init__(self, nome, registros):
+        self.nome = nome
+        self.registros = registros
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        registrar_tempo(self.nome, time.perf_counter() - self.inicio, self.registros)
+
+# Classe de handler que conta os avisos e erros enviados ao logging
+class _ContadorLogging(logging.Handler):
+    def emit(self, record):
+        contar(f"log.{record.levelname.lower()}")
+
+_contador_logging = _ContadorLogging(logging.WARNING)
+
+# Função para medir uma etapa com "with"
+def etapa(nome, registros=0):
+    """Retorna um contexto que soma o tempo do bloco à etapa `nome` (e `registros` processados).
+
+    Desligada, retorna sempre o mesmo contexto vazio: o custo é uma chamada e um teste de flag.
+    """
+    if not ATIVO:
+        return _NULO
+    return _Cronometro(nome, registros)
+
+# Função para somar um tempo já medido a uma etapa
+def registrar_tempo(nome, duracao, registros=0):
+    with _lock:
+        medida = _etapas.get(nome)
+        if medida is None:
+            medida = _etapas[nome] = [0, 0, 0.0, 0.0]
+        medida[0] += 1
+        medida[1] += registros
+        medida[2] += duracao
+        if duracao > medida[3]:
+            medida[3] = duracao
+
+# Função para incrementar um contador
+def contar(nome, quantidade=1):
+    if ATIVO:
+        with _lock:
+            _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+# Função para ligar ou desligar a instrumentação em tempo de execução
+def ativar(ativo=True):
+    """Liga (ou desliga) os timers e passa a contar os avisos e erros registrados no logging."""
+    global ATIVO
+    ATIVO = ativo
+    raiz = logging.getLogger()
+    if ativo and _contador_logging not in raiz.handlers:
+        raiz.addHandler(_contador_logging)
+    elif not ativo and _contador_logging in raiz.handlers:
+        raiz.removeHandler(_contador_logging)
+
+if ATIVO:
+    ativar()
+
+# Função para zerar as medidas
+def zerar():
+    with _lock:
+        _etapas.clear()
+        _contadores.clear()
+
+# Função para obter um retrato das medidas
+def relatorio():
+    """Retorna um dicionário (serializável em JSON) com as etapas, os contadores e as estatísticas do SQLite."""
+    import conexao
+
+    with _lock:
+        etapas = {
+            nome: {
+                "chamadas": chamadas,
+                "registros": registros,
+                "total_s": total,
+                "medio_ms": total / chamadas * 1000,
+                "maximo_ms": maximo * 1000,
+                "registros_por_segundo": registros / total if registros and total else None,
+            }
+            for nome, (chamadas, registros, total, maximo) in _etapas.items()
+        }
+        contadores = dict(_contadores)
+    return {
+        "instante": time.time(),
+        "pid": os.getpid(),
+        "etapas": etapas,
+        "contadores": contadores,
+        "sqlite": conexao.estatisticas(),
+    }
+
+# Função para formatar o relatório como texto
+def resumo():
+    """Retorna uma tabela de texto com as etapas ordenadas pelo tempo total."""
+    dados_relatorio = relatorio()
+    linhas = [f"{'etapa':<24} {'chamadas':>9} {'registros':>11} {'total (s)':>10} {'médio (ms)':>11} {'máx (ms)':>10}"]
+    for nome, medida in sorted(dados_relatorio["etapas"].items(), key=lambda item: -item[1]["total_s"]):
+        linhas.append(
+            f"{nome:<24} {medida['chamadas']:>9} {medida['registros']:>11} {medida['total_s']:>10.3f}"
+            f" {medida['medio_ms']:>11.3f} {medida['maximo_ms']:>10.3f}"
+        )
+    for nome, valor in sorted(dados_relatorio["contadores"].items()):
+        linhas.append(f"{nome:<24} {valor:>9}")
+    sqlite = dados_relatorio["sqlite"]
+    linhas.append(f"sqlite: {sqlite['conexoes_abertas']} conexões, {sqlite['consultas']} consultas, {sqlite['tempo_sqlite']:.3f}s")
+    return "\n".join(linhas)
+
+# Função para acrescentar um retrato em JSON Lines a um arquivo
+def salvar_snapshot(caminho):
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps(relatorio(), ensure_ascii=False) + "\n")
+
+# Classe que grava retratos periódicos numa thread em segundo plano
+class Snapshots:
+    """Acrescenta um retrato (JSON Lines) a `caminho` a cada `intervalo` segundos e um último ao parar."""
+
+    def __init__(self, caminho, intervalo=5.0):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="instrumentacao-snapshots", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        salvar_snapshot(self.caminho)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                salvar_snapshot(self.caminho)
+            except OSError as e:
+                logging.error(f"Erro ao gravar o retrato da instrumentação: {e}")
+
+# Função para encerrar uma captura e gravar os arquivos
+def _salvar_captura(perfil, prefixo, memoria):
+    import pstats
+    import tracemalloc
+
+    perfil.disable()
+    perfil.dump_stats(f"{prefixo}.prof")
+    with open(f"{prefixo}.txt", "w", encoding="utf-8") as arquivo:
+        pstats.Stats(perfil, stream=arquivo).sort_stats("cumulative").print_stats(40)
+    arquivos = [f"{prefixo}.prof", f"{prefixo}.txt"]
+    if memoria:
+        retrato = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        with open(f"{prefixo}.memoria.txt", "w", encoding="utf-8") as arquivo:
+            for estatistica in retrato.statistics("lineno")[:40]:
+                arquivo.write(f"{estatistica}\n")
+        arquivos.append(f"{prefixo}.memoria.txt")
+    logging.info(f"Captura do lote gravada em: {', '.join(arquivos)}")
+
+# Função para capturar o perfil de um lote específico
+def capturar_lote(lotes, indice, prefixo, memoria=False):
+    """Repassa os lotes e captura com cProfile (e tracemalloc, com `memoria`) o lote de posição `indice`.
+
+    A captura vai do pedido do lote até o consumidor pedir o próximo e, como o cProfile só
+    mede a thread em que foi ativado, cobre o que roda na thread que consome os lotes: no
+    SQLite, a geração e a escrita; em CSV e JSONL (esteira.exportar_em_esteira), a geração e
+    a codificação, já que a compressão e a escrita rodam na outra thread (ou, com
+    --processos-exportacao, a codificação e a compressão nos processos) e ficam de fora.
+
+    Grava <prefixo>.prof (para pstats/snakeviz), <prefixo>.txt com as funções mais caras
+    e <prefixo>.memoria.txt com as maiores alocações.
+    """
+    import cProfile
+    import tracemalloc
+
+    iterador = iter(lotes)
+    perfil = None
+    posicao = 0
+    try:
+        while True:
+            if posicao == indice:
+                if memoria:
+                    tracemalloc.start()
+                perfil = cProfile.Profile()
+                perfil.enable()
+            try:
+                lote = next(iterador)
+            except StopIteration:
+                return
+            yield lote
+            if perfil is not None:
+                _salvar_captura(perfil, prefixo, memoria)
+                perfil = None
+            posicao += 1
+    finally:
+        if perfil is not None:
+            _salvar_captura(perfil, prefixo, memoria)
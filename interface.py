@@ -1,14 +1,32 @@
+import time
+
+# Instante da importação, base para medir o tempo até a primeira pintura
+INICIO = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
+from tkinter import filedialog
 import os
 import sys
+import queue
 import logging
-from dados import gerar_nome, gerar_login, gerar_cpf_valido, gerar_numero_celular_completo
+import subprocess
+import threading
+import instrumentacao
+from fundo import FUNDO_PRECALCULADO, OPACIDADE_FUNDO, obter_fundo
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Colunas exibidas (e copiadas) na janela de lote
+COLUNAS_LOTE = ("nome", "login", "cpf", "celular_sem_formatacao")
+TITULOS_LOTE = ("NOME", "USUÁRIO", "CPF", "CELULAR")
+LARGURAS_LOTE = (200, 150, 110, 120)
+# Formatos de exportação oferecidos pela janela de lote, pela extensão do arquivo
+FORMATOS_POR_EXTENSAO = {".csv": "csv", ".jsonl": "jsonl", ".db": "sqlite"}
+# Intervalo (ms) entre as novas tentativas do Gerar enquanto o buffer não tem usuário pronto
+INTERVALO_ESPERA_BUFFER = 20
+
 # Função para obter o caminho absoluto para arquivos de recurso
 def resource_path(relative_path):
     """Retorna o caminho absoluto do arquivo, compatível com executáveis."""
@@ -18,18 +36,16 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-# Função para ajustar a opacidade da imagem
-def ajustar_opacidade(imagem_path, opacidade):
-    """Ajusta a opacidade da imagem especificada."""
-    if not os.path.exists(imagem_path):
-        logging.warning(f"Arquivo não encontrado: {imagem_path}")
-        return None
+# Função para iniciar o buffer de usuários fora da thread do Tk
+def iniciar_buffer(genero):
+    """Importa dados/buffer_usuarios e começa a preparar usuários sem atrasar a primeira pintura."""
+    global buffer_usuarios
+    from buffer_usuarios import BufferUsuarios
 
-    imagem = Image.open(imagem_path).convert("RGBA")
-    alpha = imagem.split()[3]
-    alpha = alpha.point(lambda p: p * opacidade)
-    imagem.putalpha(alpha)
-    return imagem
+    buffer_usuarios = BufferUsuarios()
+    buffer_usuarios.priorizar(genero)
+    buffer_usuarios.iniciar()
+    buffer_pronto.set()
 
 # Função para copiar texto usando o clipboard da janela principal
 def copiar_para_clipboard(texto, divisoria):
@@ -47,34 +63,217 @@ def animar_divisoria(divisoria):
 
 # Função para atualizar os dados na interface
 def atualizar_dados():
-    """Gera e exibe novos dados na interface."""
-    genero_selecionado = genero_var.get()
-    novo_nome = gerar_nome(genero_selecionado)
-    novo_login = gerar_login(novo_nome)
-    novo_cpf = gerar_cpf_valido()
-    novo_celular_formatado, numero_para_copiar = gerar_numero_celular_completo()  # Gera ambos os formatos
-
-    usuario_label.config(text=novo_login)
-    nome_label.config(text=novo_nome)
-    cpf_label.config(text=novo_cpf)
-    celular_label.config(text=novo_celular_formatado)  # Exibe o número formatado
+    """Exibe um usuário pronto do buffer.
+
+    Roda na thread do Tk e nunca gera nem espera: se o buffer ainda não existe ou está vazio,
+    mostra um aviso e tenta de novo (janela.after) até a produtora repor a fila.
+    """
+    global espera_agendada
+    registro = None
+    if buffer_pronto.is_set():
+        with instrumentacao.etapa("interface.obter", 1):
+            registro = buffer_usuarios.obter(genero_var.get())
+    if registro is not None:
+        exibir_usuario(registro)
+        return
+    usuario_label.config(text="Gerando...")
+    # Vários cliques durante a espera agendam uma única nova tentativa
+    if not espera_agendada:
+        espera_agendada = True
+        janela.after(INTERVALO_ESPERA_BUFFER, tentar_novamente)
+
+# Função para repetir o Gerar depois da espera pelo buffer
+def tentar_novamente():
+    global espera_agendada
+    espera_agendada = False
+    atualizar_dados()
+
+# Função para exibir um usuário nos rótulos da interface
+def exibir_usuario(registro):
+    """Exibe o usuário (tupla na ordem de dados.COLUNAS_USUARIO) e configura os botões de copiar."""
+    novo_nome, novo_login, novo_cpf, novo_celular_formatado, numero_para_copiar = registro
+
+    with instrumentacao.etapa("interface.exibir", 1):
+        usuario_label.config(text=novo_login)
+        nome_label.config(text=novo_nome)
+        cpf_label.config(text=novo_cpf)
+        celular_label.config(text=novo_celular_formatado)  # Exibe o número formatado
 
     copiar_usuario_btn['command'] = lambda: copiar_para_clipboard(novo_login, divisoria_usuario)
     copiar_nome_btn['command'] = lambda: copiar_para_clipboard(novo_nome, divisoria_nome)
     copiar_cpf_btn['command'] = lambda: copiar_para_clipboard(novo_cpf, divisoria_cpf)
     copiar_celular_btn['command'] = lambda: copiar_para_clipboard(numero_para_copiar, divisoria_celular)  # Copia sem formatação
 
+# Função para abrir a janela de geração em lote
+def abrir_janela_lote():
+    """Abre a janela que gera N usuários numa tabela virtual, com cópia em TSV e exportação.
+
+    Com uma semente, as linhas vêm do conjunto indexado (indexado.FonteIndexada): nada é gerado
+    antes, cada página visível é calculada pela posição, e a quantidade pode ser de milhões.
+    Sem semente, o lote fica num armazenamento.LoteCompacto (cerca de 16 bytes por usuário) e
+    só as linhas visíveis, copiadas ou exportadas viram strings.
+    """
+    from armazenamento import LoteCompacto
+    from exportar import exportar
+    from indexado import FonteIndexada
+    from tabela_virtual import TabelaVirtual
+
+    janela_lote = tk.Toplevel(janela)
+    janela_lote.title("Gerador Destiny - Lote")
+    janela_lote.geometry("720x480")
+    janela_lote.configure(bg="#333333")
+
+    barra = tk.Frame(janela_lote, bg="#333333", padx=10, pady=8)
+    barra.pack(fill="x")
+    tk.Label(barra, text="QUANTIDADE", bg="#333333", fg="#CCCCCC", font=("Helvetica", 9, "bold")).pack(side="left")
+    quantidade_var = tk.StringVar(value="1000")
+    tk.Entry(barra, textvariable=quantidade_var, width=9, bg="#444444", fg="#FFFFFF", insertbackground="#FFFFFF",
+             relief="flat", font=("Helvetica", 9)).pack(side="left", padx=5)
+    tk.Label(barra, text="SEMENTE", bg="#333333", fg="#CCCCCC", font=("Helvetica", 9, "bold")).pack(side="left")
+    semente_var = tk.StringVar(value="")
+    tk.Entry(barra, textvariable=semente_var, width=8, bg="#444444", fg="#FFFFFF", insertbackground="#FFFFFF",
+             relief="flat", font=("Helvetica", 9)).pack(side="left", padx=5)
+    gerar_lote_btn = tk.Button(barra, text="Gerar", background="#555555", fg="#FFFFFF", relief="flat", cursor="hand2", font=("Helvetica", 9, "bold"))
+    gerar_lote_btn.pack(side="left", padx=5)
+    copiar_btn = tk.Button(barra, text="Copiar seleção", background="#555555", fg="#FFFFFF", relief="flat", cursor="hand2", font=("Helvetica", 9))
+    copiar_btn.pack(side="left", padx=5)
+    exportar_btn = tk.Button(barra, text="Exportar", background="#555555", fg="#FFFFFF", relief="flat", cursor="hand2", font=("Helvetica", 9))
+    exportar_btn.pack(side="left", padx=5)
+    status_label = tk.Label(barra, text="", bg="#333333", fg="#CCCCCC", font=("Helvetica", 9))
+    status_label.pack(side="right")
+
+    tabela = TabelaVirtual(janela_lote, TITULOS_LOTE, LARGURAS_LOTE)
+    tabela.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    estado = {"fonte": None}
+    resultados = queue.Queue()
+    mensagens = queue.Queue()
+
+    def gerar():
+        try:
+            quantidade = int(quantidade_var.get())
+        except ValueError:
+            status_label.config(text="Quantidade inválida")
+            return
+        if quantidade <= 0:
+            status_label.config(text="Quantidade inválida")
+            return
+        genero = genero_var.get()
+        if semente_var.get().strip():
+            try:
+                semente = int(semente_var.get())
+            except ValueError:
+                status_label.config(text="Semente inválida")
+                return
+            estado["fonte"] = FonteIndexada(semente, quantidade, COLUNAS_LOTE, genero)
+            tabela.definir_fonte(estado["fonte"])
+            status_label.config(text=f"{quantidade} usuários (semente {semente})")
+            return
+        gerar_lote_btn.config(state="disabled")
+        status_label.config(text="Gerando...")
+
+        # A geração roda fora da thread do Tk; o progresso e o lote pronto (ou None, se falhar) voltam pela fila
+        def gerar_em_segundo_plano():
+            lote = None
+            try:
+                lote = LoteCompacto(genero, colunas=COLUNAS_LOTE)
+                lote.gerar(quantidade, progresso=lambda total: resultados.put(total))
+            except Exception as e:
+                logging.error(f"Erro ao gerar o lote: {e}")
+                lote = None
+            finally:
+                # Sempre responde: a interface para de consultar a fila e reabilita o botão
+                resultados.put(lote)
+
+        threading.Thread(target=gerar_em_segundo_plano, daemon=True).start()
+        janela_lote.after(20, receber)
+
+    def receber():
+        try:
+            item = resultados.get_nowait()
+            while isinstance(item, int):
+                status_label.config(text=f"Gerando... {item}")
+                item = resultados.get_nowait()
+        except queue.Empty:
+            janela_lote.after(20, receber)
+            return
+        gerar_lote_btn.config(state="normal")
+        if item is None:
+            status_label.config(text="Erro ao gerar")
+            return
+        estado["fonte"] = item
+        tabela.definir_fonte(item)
+        status_label.config(text=f"{len(item)} usuários ({item.tamanho_bytes() / 2 ** 20:.1f} MB)")
+
+    def copiar_selecao(_evento=None):
+        linhas = ["\t".join(linha) for linha in tabela.linhas_selecionadas()]
+        if linhas:
+            janela_lote.clipboard_clear()
+            janela_lote.clipboard_append("\n".join(linhas))
+            status_label.config(text=f"{len(linhas)} linhas copiadas")
+
+    def exportar_arquivo():
+        if estado["fonte"] is None:
+            return
+        destino = filedialog.asksaveasfilename(
+            parent=janela_lote, defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("SQLite", "*.db")],
+        )
+        if not destino:
+            return
+        formato = FORMATOS_POR_EXTENSAO.get(os.path.splitext(destino)[1].lower(), "csv")
+        lotes = estado["fonte"].lotes()
+
+        # A exportação (que pode ter milhões de linhas) roda fora da thread do Tk
+        def exportar_em_segundo_plano():
+            mensagem = "Erro ao exportar"
+            try:
+                total = exportar(lotes, formato, destino)
+                mensagem = f"{total} usuários exportados"
+            except Exception as e:
+                # Inclui sqlite3.Error (ex.: tabela usuarios existente com outras colunas)
+                logging.error(f"Erro ao exportar o lote: {e}")
+            finally:
+                # Sempre responde: a interface para de consultar a fila e reabilita o botão
+                mensagens.put(mensagem)
+
+        exportar_btn.config(state="disabled")
+        status_label.config(text="Exportando...")
+        threading.Thread(target=exportar_em_segundo_plano, daemon=True).start()
+        janela_lote.after(100, receber_mensagem)
+
+    def receber_mensagem():
+        try:
+            mensagem = mensagens.get_nowait()
+        except queue.Empty:
+            janela_lote.after(100, receber_mensagem)
+            return
+        exportar_btn.config(state="normal")
+        status_label.config(text=mensagem)
+
+    gerar_lote_btn['command'] = gerar
+    copiar_btn['command'] = copiar_selecao
+    exportar_btn['command'] = exportar_arquivo
+    tabela.canvas.bind("<Control-c>", copiar_selecao)
+
 # Função principal para criar a interface completa
-def criar_interface():
-    """Configura e inicia a interface gráfica principal."""
+def criar_interface(sair_apos_pintura=False):
+    """Configura e inicia a interface gráfica principal.
+
+    Com `sair_apos_pintura`, imprime o tempo até a primeira pintura e fecha a janela (usado por medir_inicio).
+    """
     global janela, usuario_label, nome_label, cpf_label, celular_label
     global copiar_usuario_btn, copiar_nome_btn, copiar_cpf_btn, copiar_celular_btn
     global divisoria_usuario, divisoria_nome, divisoria_cpf, divisoria_celular
-    global genero_var
+    global genero_var, buffer_usuarios, buffer_pronto, espera_agendada
+
+    buffer_usuarios = None
+    buffer_pronto = threading.Event()
+    espera_agendada = False
 
     janela = tk.Tk()
     janela.title("Gerador Destiny")
-    janela.geometry("260x520")
+    janela.geometry("260x560")
     janela.configure(bg="#333333")
     janela.resizable(False, False)
 
@@ -85,12 +284,12 @@ def criar_interface():
     else:
         logging.warning("Ícone não encontrado.")
 
-    # Carregar a imagem de fundo com opacidade ajustada
+    # Carregar a imagem de fundo já misturada (PNG em cache, lido direto pelo Tk)
     imagem_path = resource_path("assets/background.jpg")
-    imagem_fundo = ajustar_opacidade(imagem_path, 0.1)
+    fundo_path = obter_fundo(imagem_path, OPACIDADE_FUNDO, resource_path(FUNDO_PRECALCULADO))
 
-    if imagem_fundo is not None:
-        imagem_fundo_tk = ImageTk.PhotoImage(imagem_fundo)
+    if fundo_path is not None:
+        imagem_fundo_tk = tk.PhotoImage(file=fundo_path)
         background_label = tk.Label(janela, image=imagem_fundo_tk, bg="#333333")
         background_label.place(relwidth=1, relheight=1)
         background_label.lower()
@@ -108,6 +307,7 @@ def criar_interface():
 
     # Seleção de Gênero
     genero_var = tk.StringVar(value="N")
+    genero_var.trace_add("write", lambda *_: buffer_pronto.is_set() and buffer_usuarios.priorizar(genero_var.get()))
     tk.Label(frame_principal, text="SELEÇÃO DE GÊNERO", bg="#333333", fg="#CCCCCC", font=("Helvetica", 10, "bold")).pack(anchor="w")
     genero_frame = tk.Frame(frame_principal, bg="#333333")
     genero_frame.pack(fill="x", pady=5)
@@ -118,7 +318,37 @@ def criar_interface():
 
     configurar_elementos_interface(frame_principal)
 
+    # Banco e vocabulário só começam a carregar depois que a janela foi pintada
+    def apos_pintura():
+        janela.wait_visibility()
+        janela.update_idletasks()
+        threading.Thread(target=iniciar_buffer, args=(genero_var.get(),), name="iniciar-buffer", daemon=True).start()
+        if sair_apos_pintura:
+            print(f"{(time.perf_counter() - INICIO) * 1000:.1f}", flush=True)
+            janela.destroy()
+
+    janela.after_idle(apos_pintura)
     janela.mainloop()
+    if buffer_usuarios is not None:
+        buffer_usuarios.parar()
+    if instrumentacao.ATIVO:
+        logging.info(f"Instrumentação:\n{instrumentacao.resumo()}")
+
+# Função para medir o tempo de abertura da interface
+def medir_inicio(repeticoes=5):
+    """Abre a interface `repeticoes` vezes em processos novos e retorna os tempos até a primeira pintura (ms).
+
+    Cada medida inclui a criação do processo e as importações; a primeira execução também
+    mostra o custo de gerar o fundo quando o cache ainda não existe.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--sair-apos-pintura"],
+                               capture_output=True, text=True, check=True).stdout
+        total = (time.perf_counter() - inicio) * 1000
+        tempos.append((total, float(saida.split()[-1])))
+    return tempos
 
 def configurar_elementos_interface(frame_principal):
     """Configura os elementos da interface."""
@@ -184,7 +414,11 @@ def configurar_elementos_interface(frame_principal):
 
     # Botão para gerar novos dados
     gerar_btn = tk.Button(frame_principal, text="Gerar", command=atualizar_dados, background="#555555", fg="#FFFFFF", relief="flat", cursor="hand2", font=("Helvetica", 10, "bold"))
-    gerar_btn.pack(pady=10)
+    gerar_btn.pack(pady=(10, 0))
+
+    # Botão para abrir a janela de geração em lote
+    lote_btn = tk.Button(frame_principal, text="Lote", command=abrir_janela_lote, background="#555555", fg="#FFFFFF", relief="flat", cursor="hand2", font=("Helvetica", 9))
+    lote_btn.pack(pady=(5, 10))
 
     # Checkbox para manter sempre no topo
     manter_topo_var = tk.BooleanVar()
@@ -195,4 +429,10 @@ def configurar_elementos_interface(frame_principal):
 
 # Chamada principal
 if __name__ == "__main__":
-    criar_interface()
+    if "--sair-apos-pintura" in sys.argv:
+        criar_interface(sair_apos_pintura=True)
+    elif "--medir-inicio" in sys.argv:
+        for processo_ms, interface_ms in medir_inicio():
+            print(f"primeira pintura: {processo_ms:.1f} ms desde o processo, {interface_ms:.1f} ms desde a importação")
+    else:
+        criar_interface()
@@ -1,6 +1,12 @@
 # src/main.py
 
-from interface import criar_interface
+import sys
 
 if __name__ == "__main__":
-    criar_interface()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Modo sem interface gráfica: não importa tkinter nem PIL
+        from cli import main
+        sys.exit(main())
+    else:
+        from interface import criar_interface
+        criar_interface()
@@ -0,0 +1,63 @@
+import os
+import random
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import dados
+import esquema
+
+# Função executada uma vez em cada processo filho
+def _inicializar_processo(vocabulario, db_path):
+    """Instala o banco e o vocabulário recebidos do processo principal, sem abrir o SQLite no filho.
+
+    O caminho vem explícito porque, com o método "spawn", o filho não herda o
+    dados.definir_caminho_banco do pai e, ao reverificar o banco, leria o banco padrão.
+    """
+    dados.definir_caminho_banco(db_path)
+    dados.instalar_vocabulario(vocabulario)
+
+# Função que gera um lote (shard) a partir da sua semente derivada
+def gerar_lote(indice, n, descartar, genero, semente):
+    """Gera o lote `indice` de um plano de dados.planejar_lotes (o mesmo lote de PlanoEsquema.gerar_lotes).
+
+    Usa o plano do esquema embutido "padrao", que produz as colunas de dados.gerar_usuarios.
+    """
+    rng = random.Random(dados.derivar_semente(semente, indice))
+    lote = esquema.obter_plano("padrao", genero).gerar(n, rng)
+    return dados.fatiar_lote(lote, descartar) if descartar else lote
+
+# Função para criar o pool de processos geradores
+def criar_pool(processos=None):
+    """Cria um ProcessPoolExecutor cujos processos recebem o vocabulário já carregado neste processo."""
+    processos = processos or os.cpu_count() or 1
+    vocabulario = dados.obter_vocabulario()
+    return ProcessPoolExecutor(processos, initializer=_inicializar_processo, initargs=(vocabulario, dados.get_db_path()))
+
+# Função para gerar lotes de usuários usando vários processos
+def gerar_lotes_paralelo(total, genero=None, tamanho_lote=10000, semente=None, processos=None, inicio=0):
+    """Gera `total` usuários em lotes distribuídos num pool de processos, entregues em ordem.
+
+    Cada lote é um shard com semente derivada de (semente, índice do lote), então a mesma
+    semente e o mesmo tamanho de lote produzem exatamente a mesma saída de PlanoEsquema.gerar_lotes,
+    qualquer que seja o número de processos. No máximo 2 lotes por processo ficam pendentes,
+    mantendo a memória limitada mesmo quando o consumidor é mais lento que os geradores.
+    `inicio` pula os primeiros registros, como em PlanoEsquema.gerar_lotes.
+    """
+    processos = processos or os.cpu_count() or 1
+    if semente is None:
+        semente = random.SystemRandom().getrandbits(64)
+        logging.info(f"Semente gerada para a geração paralela: {semente}")
+
+    # O vocabulário é lido uma única vez e compartilhado com os filhos na inicialização
+    plano = dados.planejar_lotes(total, tamanho_lote, inicio)
+    max_pendentes = 2 * processos
+
+    with criar_pool(processos) as pool:
+        pendentes = deque()
+        for indice, n, descartar in plano:
+            pendentes.append(pool.submit(gerar_lote, indice, n, descartar, genero, semente))
+            if len(pendentes) >= max_pendentes:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
@@ -0,0 +1,223 @@
+import sys
+import json
+import random
+import asyncio
+import logging
+import argparse
+from urllib.parse import parse_qs, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import dados
+import paralelo
+from dados import COLUNAS_USUARIO
+from exportar import codificar_jsonl
+from indexado import gerar_intervalo, gerar_usuario_indice
+
+# Endereço padrão: só a máquina local
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8080
+# Usuários gerados (e enviados) por bloco da resposta
+TAMANHO_BLOCO_PADRAO = 1000
+# Limites do pedido HTTP
+TAMANHO_MAXIMO_CABECALHO = 16 * 1024
+TEMPO_LIMITE_CABECALHO = 10.0
+
+# Textos dos status HTTP usados nas respostas
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+# Função executada no executor: gera um bloco e já o codifica
+def gerar_bloco_jsonl(indice, n, descartar, genero, semente):
+    """Gera o lote `indice` (mesmos usuários da geração sequencial com a mesma semente) e o retorna em JSON Lines (bytes)."""
+    return codificar_jsonl(paralelo.gerar_lote(indice, n, descartar, genero, semente)).encode("utf-8")
+
+# Função executada no executor: gera os registros [inicio, fim) do conjunto indexado e os codifica
+def gerar_intervalo_jsonl(semente, inicio, fim, genero):
+    return codificar_jsonl(gerar_intervalo(semente, inicio, fim, genero)).encode("utf-8")
+
+# Função para interpretar os parâmetros de /usuarios e /usuario
+def ler_parametros(consulta):
+    """Retorna o dicionário n, genero, seed, inicio, i e indexado da query string.
+
+    Levanta ValueError com a mensagem para o cliente se algum valor for inválido.
+    """
+    brutos = {chave: valores[-1] for chave, valores in parse_qs(consulta).items()}
+    parametros = {}
+    try:
+        parametros["n"] = int(brutos.get("n", "1"))
+        parametros["inicio"] = int(brutos.get("inicio", "0"))
+        parametros["i"] = int(brutos["i"]) if "i" in brutos else None
+        parametros["seed"] = int(brutos["seed"]) if "seed" in brutos else None
+    except ValueError:
+        raise ValueError("n, inicio, i e seed devem ser inteiros.") from None
+    if parametros["n"] < 0 or parametros["inicio"] < 0 or (parametros["i"] or 0) < 0:
+        raise ValueError("n, inicio e i não podem ser negativos.")
+    genero = brutos.get("genero", "N").upper()
+    if genero not in ("M", "F", "N"):
+        raise ValueError("genero deve ser M, F ou N.")
+    parametros["genero"] = None if genero == "N" else genero
+    parametros["indexado"] = brutos.get("indexado", "0").lower() in ("1", "true", "sim")
+    return parametros
+
+# Classe do servidor HTTP que transmite usuários em JSON Lines
+class ServidorUsuarios:
+    """Servidor HTTP/1.1 mínimo sobre asyncio.
+
+    GET /usuarios?n=&genero=&seed=&inicio=&indexado= responde em Transfer-Encoding chunked, um
+    bloco de `tamanho_bloco` usuários por vez, com os registros [inicio, inicio + n). Com
+    indexado=1 os registros vêm de indexado.gerar_intervalo (cada um calculado direto pela
+    posição, qualquer que seja o bloco); sem ele, dos lotes de dados.planejar_lotes, com as sementes de dados.derivar_semente.
+    GET /usuario?seed=&i=&genero= retorna só o registro i do conjunto indexado. A geração e a codificação rodam no `executor`, e cada
+    bloco só é enviado depois que o anterior foi escoado (writer.drain): por cliente ficam em
+    memória no máximo o bloco em envio e o próximo já pedido ao executor. A semente usada
+    volta no cabeçalho X-Semente, para o cliente reproduzir a mesma resposta.
+    """
+
+    def __init__(self, executor, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        self.executor = executor
+        self.tamanho_bloco = tamanho_bloco
+        self.clientes = 0
+
+    async def iniciar(self, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        return await asyncio.start_server(self._atender, host, porta, limit=TAMANHO_MAXIMO_CABECALHO)
+
+    async def _atender(self, reader, writer):
+        self.clientes += 1
+        try:
+            try:
+                cabecalho = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TEMPO_LIMITE_CABECALHO)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+            linha = cabecalho.split(b"\r\n", 1)[0].decode("latin-1").split()
+            if len(linha) != 3:
+                await self._responder(writer, 400, {"erro": "pedido inválido"})
+                return
+            metodo, alvo, _ = linha
+            url = urlsplit(alvo)
+            if url.path == "/saude":
+                await self._responder(writer, 200, {"status": "ok", "clientes": self.clientes})
+            elif url.path not in ("/usuarios", "/usuario"):
+                await self._responder(writer, 404, {"erro": "caminho não encontrado"})
+            elif metodo != "GET":
+                await self._responder(writer, 405, {"erro": "use GET"})
+            else:
+                try:
+                    parametros = ler_parametros(url.query)
+                except ValueError as e:
+                    await self._responder(writer, 400, {"erro": str(e)})
+                    return
+                if url.path == "/usuario":
+                    await self._responder_usuario(writer, parametros)
+                else:
+                    await self._transmitir(writer, parametros)
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logging.error(f"Erro ao atender o cliente: {e}")
+        finally:
+            self.clientes -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _responder(self, writer, status, corpo):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_STATUS[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(conteudo)}\r\nConnection: close\r\n\r\n".encode("latin-1") + conteudo
+        )
+        await writer.drain()
+
+    async def _responder_usuario(self, writer, parametros):
+        if parametros["seed"] is None or parametros["i"] is None:
+            await self._responder(writer, 400, {"erro": "informe seed e i."})
+            return
+        registro = await asyncio.get_running_loop().run_in_executor(
+            self.executor, gerar_usuario_indice, parametros["seed"], parametros["i"], parametros["genero"])
+        await self._responder(writer, 200, dict(zip(COLUNAS_USUARIO, registro)))
+
+    # Função para listar as tarefas (função, argumentos) que geram os blocos da resposta
+    def _tarefas(self, parametros, semente):
+        inicio, genero = parametros["inicio"], parametros["genero"]
+        fim = inicio + parametros["n"]
+        if parametros["indexado"]:
+            for posicao in range(inicio, fim, self.tamanho_bloco):
+                yield gerar_intervalo_jsonl, (semente, posicao, min(posicao + self.tamanho_bloco, fim), genero)
+        else:
+            for indice, tamanho, descartar in dados.planejar_lotes(fim, self.tamanho_bloco, inicio):
+                yield gerar_bloco_jsonl, (indice, tamanho, descartar, genero, semente)
+
+    async def _transmitir(self, writer, parametros):
+        semente = parametros["seed"]
+        if semente is None:
+            semente = random.SystemRandom().getrandbits(63)
+        writer.write(
+            "HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\n"
+            f"Transfer-Encoding: chunked\r\nX-Semente: {semente}\r\nConnection: close\r\n\r\n".encode("latin-1")
+        )
+        loop = asyncio.get_running_loop()
+        pendente = None
+        try:
+            for funcao, argumentos in self._tarefas(parametros, semente):
+                # Pede o próximo bloco antes de enviar o atual: geração e envio se sobrepõem
+                proximo = loop.run_in_executor(self.executor, funcao, *argumentos)
+                if pendente is not None:
+                    await self._enviar_bloco(writer, await pendente)
+                pendente = proximo
+            if pendente is not None:
+                await self._enviar_bloco(writer, await pendente)
+                pendente = None
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            if pendente is not None:
+                pendente.cancel()
+
+    async def _enviar_bloco(self, writer, conteudo):
+        if conteudo:
+            writer.write(b"%x\r\n%s\r\n" % (len(conteudo), conteudo))
+            # Espera o cliente consumir: um cliente lento segura a geração em vez de acumular memória
+            await writer.drain()
+
+# Função para criar o executor da geração
+def criar_executor(workers=1):
+    """workers=1: threads no próprio processo; 0 ou mais de 1: pool de processos (0 = um por núcleo)."""
+    if workers == 1:
+        dados.obter_vocabulario()
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix="gerador")
+    return paralelo.criar_pool(workers or None)
+
+# Função para executar o servidor até ser interrompido
+async def servir(host=HOST_PADRAO, porta=PORTA_PADRAO, workers=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    executor = criar_executor(workers)
+    try:
+        servidor = await ServidorUsuarios(executor, tamanho_bloco).iniciar(host, porta)
+        enderecos = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+        logging.info(f"Servindo usuários em http://{enderecos}/usuarios?n=10")
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Função principal do servidor
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP local que transmite usuários gerados em JSON Lines.")
+    parser.add_argument("--host", default=HOST_PADRAO, help="endereço de escuta (padrão: %(default)s)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="porta (padrão: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="1 = threads no próprio processo; N > 1 processos geradores; 0 = um por núcleo (padrão: 1)")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO,
+                        help="usuários por bloco da resposta; com o mesmo bloco e seed a saída do CLI é a mesma (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.bloco <= 0:
+        logging.error("--workers não pode ser negativo e --bloco deve ser positivo.")
+        return 2
+    try:
+        asyncio.run(servir(args.host, args.porta, args.workers, args.bloco))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
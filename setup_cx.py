@@ -2,12 +2,21 @@
 
 import os
 from cx_Freeze import setup, Executable
+from fundo import FUNDO_PRECALCULADO, OPACIDADE_FUNDO, gerar_fundo
+from setup_db import gerar_vocabulario_binario
+
+# Pré-calcula o fundo misturado: o executável abre a imagem direto no Tk, sem o PIL
+gerar_fundo("assets/background.jpg", OPACIDADE_FUNDO, FUNDO_PRECALCULADO)
+# Pré-compila o vocabulário: o executável mapeia nomes.vocab em vez de ler o nomes.db a cada abertura
+gerar_vocabulario_binario("nomes.db")
 
 # Caminhos adicionais para garantir que os recursos sejam incluídos
 additional_files = [
     ("assets/icone.ico", "assets/icone.ico"),
     ("assets/background.jpg", "assets/background.jpg"),
-    ("nomes.db", "nomes.db")
+    (FUNDO_PRECALCULADO, FUNDO_PRECALCULADO),
+    ("nomes.db", "nomes.db"),
+    ("nomes.vocab", "nomes.vocab")
 ]
 
 executables = [
@@ -25,7 +34,8 @@ setup(
     author="vhmac",
     options={
         "build_exe": {
-            "packages": ["tkinter", "Pillow", "sqlite3"],
+            "packages": ["tkinter", "sqlite3"],
+            "excludes": ["PIL"],
             "include_files": additional_files,
             "include_msvcr": True,
             "path": ["."]
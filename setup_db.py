@@ -1,9 +1,46 @@
 import sqlite3
 import os
+import csv
+import sys
+import argparse
+import itertools
 
-def criar_banco_de_dados():
+# Tabelas de primeiros nomes e sobrenomes usadas na importação de listas grandes
+ESQUEMA_IMPORTACAO = (
+    '''
+    CREATE TABLE IF NOT EXISTS primeiros_nomes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        genero TEXT NOT NULL,
+        frequencia INTEGER NOT NULL DEFAULT 1,
+        UNIQUE (nome, genero)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS sobrenomes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sobrenome TEXT NOT NULL UNIQUE,
+        frequencia INTEGER NOT NULL DEFAULT 1
+    )
+    ''',
+)
+
+# Nomes aceitos para cada coluna dos arquivos importados
+COLUNAS_NOME = ("nome", "primeiro_nome", "name", "first_name")
+COLUNAS_SOBRENOME = ("sobrenome", "surname", "last_name", "nome")
+COLUNAS_GENERO = ("genero", "sexo", "sex", "gender")
+COLUNAS_FREQUENCIA = ("frequencia", "freq", "frequency", "count", "quantidade")
+COLUNAS_DDD = ("codigo", "ddd")
+COLUNAS_POPULACAO = ("populacao", "population", "habitantes")
+# Partículas mantidas em minúsculas nos nomes importados
+PARTICULAS = {"da", "de", "do", "das", "dos", "e"}
+
+def caminho_banco_padrao():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nomes.db')
+
+def criar_banco_de_dados(db_path=None):
     # Define o caminho absoluto para o banco de dados
-    db_path = os.path.join(os.path.dirname(__file__), 'nomes.db')
+    db_path = db_path or caminho_banco_padrao()
 
     # Verifica se o banco de dados já existe e apaga o antigo
     if os.path.exists(db_path):
@@ -99,6 +136,11 @@ def criar_banco_de_dados():
         conn.commit()
         print(f"{len(ddds_validos)} DDDs inseridos no banco de dados.")
 
+        # Tabelas vazias para a importação de primeiros nomes e sobrenomes
+        for comando in ESQUEMA_IMPORTACAO:
+            cursor.execute(comando)
+        conn.commit()
+
         # Verifica se os dados foram inseridos corretamente
         cursor.execute('SELECT COUNT(*) FROM nomes')
         count_nomes = cursor.fetchone()[0]
@@ -119,5 +161,218 @@ def criar_banco_de_dados():
         conn.close()
         print("Conexão com o banco de dados encerrada.")
 
+# Função para normalizar a grafia de um nome importado
+def normalizar_nome(nome):
+    """Remove espaços extras e capitaliza cada parte, mantendo partículas (da, de, dos...) em minúsculas."""
+    partes = nome.split()
+    return " ".join(
+        parte.lower() if i > 0 and parte.lower() in PARTICULAS else parte.capitalize()
+        for i, parte in enumerate(partes)
+    )
+
+# Função para normalizar o gênero de um nome importado
+def normalizar_genero(genero):
+    genero = (genero or "").strip().upper()
+    if genero in ("M", "MASCULINO", "MALE", "H", "HOMEM"):
+        return "M"
+    if genero in ("F", "FEMININO", "FEMALE", "MULHER"):
+        return "F"
+    return "N"
+
+# Função para ler um arquivo CSV/TSV linha a linha
+def ler_arquivo_delimitado(caminho):
+    """Gera dicionários (chaves em minúsculas) de um CSV ou TSV com cabeçalho, sem carregar o arquivo inteiro."""
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+        arquivo.seek(0)
+        if caminho.lower().endswith((".tsv", ".tab")):
+            delimitador = "\t"
+        else:
+            try:
+                delimitador = csv.Sniffer().sniff(amostra, delimiters=",;\t|").delimiter
+            except csv.Error:
+                delimitador = ","
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [coluna.strip().lower() for coluna in next(leitor, [])]
+        for linha in leitor:
+            if linha:
+                yield dict(zip(cabecalho, linha))
+
+def _valor(registro, colunas, padrao=None):
+    for coluna in colunas:
+        valor = registro.get(coluna)
+        if valor not in (None, ""):
+            return valor.strip()
+    return padrao
+
+def _frequencia(registro):
+    valor = _valor(registro, COLUNAS_FREQUENCIA, "1")
+    try:
+        return max(int(float(valor.replace(",", "."))), 1)
+    except ValueError:
+        return 1
+
+# Função para inserir registros em transações de tamanho fixo
+def _inserir_em_blocos(conn, tabela, colunas, chave, registros, tamanho_bloco):
+    """Importa os registros (tuplas na ordem de `colunas`) para `tabela`; retorna (lidos, novas linhas).
+
+    Os blocos vão primeiro para uma tabela temporária, um commit por bloco, onde as linhas
+    repetidas do arquivo (mesma `chave`) somam a frequência. Só então a tabela final recebe
+    o total de cada chave, substituindo a frequência de uma importação anterior.
+    """
+    temporaria = f"importacao_{tabela}"
+    lista_colunas = ", ".join(colunas)
+    lista_chave = ", ".join(chave)
+    conn.execute(f"DROP TABLE IF EXISTS temp.{temporaria}")
+    conn.execute(f"CREATE TEMP TABLE {temporaria} ({lista_colunas}, PRIMARY KEY ({lista_chave}))")
+    comando = (
+        f"INSERT INTO {temporaria} ({lista_colunas}) VALUES ({', '.join('?' * len(colunas))}) "
+        f"ON CONFLICT ({lista_chave}) DO UPDATE SET frequencia = frequencia + excluded.frequencia"
+    )
+    lidos = 0
+    try:
+        while True:
+            bloco = list(itertools.islice(registros, tamanho_bloco))
+            if not bloco:
+                break
+            conn.executemany(comando, bloco)
+            conn.commit()
+            lidos += len(bloco)
+        antes = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        # "WHERE true" evita que o SQLite leia o ON CONFLICT como parte de um JOIN
+        conn.execute(
+            f"INSERT INTO {tabela} ({lista_colunas}) SELECT {lista_colunas} FROM {temporaria} WHERE true "
+            f"ON CONFLICT ({lista_chave}) DO UPDATE SET frequencia = excluded.frequencia"
+        )
+        conn.commit()
+        return lidos, conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] - antes
+    finally:
+        conn.execute(f"DROP TABLE IF EXISTS temp.{temporaria}")
+
+# Função para preparar um banco existente para a importação
+def _abrir_para_importacao(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    for comando in ESQUEMA_IMPORTACAO:
+        conn.execute(comando)
+    conn.commit()
+    return conn
+
+# Função para importar primeiros nomes de um arquivo grande
+def importar_primeiros_nomes(caminho, db_path=None, genero=None, tamanho_bloco=50000):
+    """Importa primeiros nomes (com gênero e frequência) de um CSV/TSV para a tabela primeiros_nomes.
+
+    O arquivo é lido em streaming e gravado em transações de `tamanho_bloco` linhas, com
+    memória constante. Um nome repetido no arquivo não cria outra linha: as frequências
+    são somadas, para que os pesos do sorteio continuem proporcionais. Um nome que já
+    estava no banco fica com a frequência do arquivo (reimportar o mesmo arquivo não muda
+    nada). `genero` força o gênero de todas as linhas quando o arquivo não tem essa coluna.
+    """
+    db_path = db_path or caminho_banco_padrao()
+    registros = (
+        (normalizar_nome(nome.split()[0]), normalizar_genero(genero or _valor(registro, COLUNAS_GENERO)), _frequencia(registro))
+        for registro in ler_arquivo_delimitado(caminho)
+        for nome in [_valor(registro, COLUNAS_NOME)]
+        if nome
+    )
+    conn = _abrir_para_importacao(db_path)
+    try:
+        lidos, inseridos = _inserir_em_blocos(
+            conn, "primeiros_nomes", ("nome", "genero", "frequencia"), ("nome", "genero"), registros, tamanho_bloco,
+        )
+    finally:
+        conn.close()
+    print(f"{lidos} primeiros nomes lidos de '{caminho}', {inseridos} novos (os repetidos no arquivo somaram a frequência).")
+    return inseridos
+
+# Função para importar sobrenomes de um arquivo grande
+def importar_sobrenomes(caminho, db_path=None, tamanho_bloco=50000):
+    """Importa sobrenomes (com frequência) de um CSV/TSV para a tabela sobrenomes, como em importar_primeiros_nomes."""
+    db_path = db_path or caminho_banco_padrao()
+    registros = (
+        (normalizar_nome(sobrenome), _frequencia(registro))
+        for registro in ler_arquivo_delimitado(caminho)
+        for sobrenome in [_valor(registro, COLUNAS_SOBRENOME)]
+        if sobrenome
+    )
+    conn = _abrir_para_importacao(db_path)
+    try:
+        lidos, inseridos = _inserir_em_blocos(
+            conn, "sobrenomes", ("sobrenome", "frequencia"), ("sobrenome",), registros, tamanho_bloco,
+        )
+    finally:
+        conn.close()
+    print(f"{lidos} sobrenomes lidos de '{caminho}', {inseridos} novos (os repetidos no arquivo somaram a frequência).")
+    return inseridos
+
+# Função para importar a população atendida por cada DDD
+def importar_populacao_ddd(caminho, db_path=None):
+    """Grava a coluna ddd.populacao a partir de um CSV/TSV (codigo, populacao), usada como peso no sorteio do DDD."""
+    db_path = db_path or caminho_banco_padrao()
+    conn = sqlite3.connect(db_path)
+    try:
+        colunas = {linha[1] for linha in conn.execute("PRAGMA table_info(ddd)")}
+        if "populacao" not in colunas:
+            conn.execute("ALTER TABLE ddd ADD COLUMN populacao INTEGER")
+        atualizacoes = []
+        for registro in ler_arquivo_delimitado(caminho):
+            codigo = _valor(registro, COLUNAS_DDD)
+            populacao = _valor(registro, COLUNAS_POPULACAO)
+            if codigo and populacao:
+                atualizacoes.append((int(float(populacao.replace(",", "."))), codigo.zfill(2)))
+        antes = conn.total_changes
+        conn.executemany("UPDATE ddd SET populacao = ? WHERE codigo = ?", atualizacoes)
+        conn.commit()
+        print(f"População atualizada para {conn.total_changes - antes} DDDs.")
+    finally:
+        conn.close()
+
+# Função para gravar o vocabulário binário ao lado do banco
+def gerar_vocabulario_binario(db_path=None):
+    """Grava <banco>.vocab (ver vocabulario_binario.py), que o gerador mapeia na abertura no lugar de ler o SQLite.
+
+    Deve rodar depois de qualquer alteração no banco: um arquivo de outro conteúdo é ignorado.
+    """
+    import dados
+    import vocabulario_binario
+
+    db_path = os.path.abspath(db_path or caminho_banco_padrao())
+    dados.definir_caminho_banco(db_path)
+    try:
+        vocabulario = dados.carregar_vocabulario(usar_binario=False)
+    finally:
+        dados.definir_caminho_banco(None)
+    if vocabulario is None:
+        raise RuntimeError(f"Não foi possível ler o vocabulário de '{db_path}'.")
+    caminho = vocabulario_binario.escrever(
+        vocabulario_binario.caminho_arquivo_vocabulario(db_path), vocabulario, vocabulario_binario.impressao_banco(db_path)
+    )
+    print(f"Vocabulário binário gravado em '{caminho}'.")
+    return caminho
+
 if __name__ == "__main__":
-    criar_banco_de_dados()
+    parser = argparse.ArgumentParser(description="Cria o nomes.db ou importa listas de nomes para ele.")
+    parser.add_argument("--banco", default=None, help="caminho do banco (padrão: nomes.db ao lado deste script)")
+    parser.add_argument("--nomes", action="append", default=[], help="CSV/TSV de primeiros nomes (nome, genero, frequencia)")
+    parser.add_argument("--sobrenomes", action="append", default=[], help="CSV/TSV de sobrenomes (sobrenome, frequencia)")
+    parser.add_argument("--ddd", default=None, help="CSV/TSV com a população por DDD (codigo, populacao)")
+    parser.add_argument("--genero", choices=["M", "F"], default=None, help="gênero aplicado aos arquivos de --nomes sem essa coluna")
+    parser.add_argument("--tamanho-bloco", type=int, default=50000, help="linhas por transação na importação")
+    args = parser.parse_args()
+
+    if not args.nomes and not args.sobrenomes and not args.ddd:
+        criar_banco_de_dados(args.banco)
+        gerar_vocabulario_binario(args.banco)
+        sys.exit(0)
+
+    db_path = args.banco or caminho_banco_padrao()
+    if not os.path.exists(db_path):
+        criar_banco_de_dados(db_path)
+    for caminho in args.nomes:
+        importar_primeiros_nomes(caminho, db_path, args.genero, args.tamanho_bloco)
+    for caminho in args.sobrenomes:
+        importar_sobrenomes(caminho, db_path, args.tamanho_bloco)
+    if args.ddd:
+        importar_populacao_ddd(args.ddd, db_path)
+    gerar_vocabulario_binario(db_path)
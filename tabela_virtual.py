@@ -0,0 +1,163 @@
+import tkinter as tk
+
+# Cores seguindo o tema escuro da janela principal
+COR_FUNDO = "#333333"
+COR_LINHA = "#444444"
+COR_LINHA_ALTERNADA = "#3C3C3C"
+COR_SELECAO = "#2E6B3A"
+COR_TEXTO = "#FFFFFF"
+COR_CABECALHO = "#CCCCCC"
+
+# Classe que adapta um lote em colunas (dicionário de listas) para a tabela virtual
+class FonteLote:
+    """Fonte de linhas sobre um lote de dados.gerar_usuarios, sem copiar os dados."""
+
+    def __init__(self, lote, colunas):
+        self._colunas = [lote[coluna] for coluna in colunas]
+        self._total = len(self._colunas[0]) if self._colunas else 0
+
+    def __len__(self):
+        return self._total
+
+    def linha(self, indice):
+        return tuple(coluna[indice] for coluna in self._colunas)
+
+# Classe da tabela que desenha apenas as linhas visíveis
+class TabelaVirtual(tk.Frame):
+    """Tabela rolável que reaproveita um conjunto fixo de itens do Canvas para as linhas visíveis.
+
+    A quantidade de widgets e o custo de redesenho dependem só da altura da janela, não do
+    número de linhas da fonte (qualquer objeto com __len__ e linha(indice)). A seleção é um
+    intervalo contínuo (clique e Shift+clique, Ctrl+A para tudo).
+    """
+
+    ALTURA_LINHA = 20
+
+    def __init__(self, master, titulos, larguras, **opcoes):
+        super().__init__(master, bg=COR_FUNDO, **opcoes)
+        self.larguras = larguras
+        self.fonte = None
+        self.primeira = 0
+        self.ancora = None
+        self.selecao = None  # (inicio, fim) inclusivo
+        self._linhas = []  # [(retangulo, [textos])] reaproveitados a cada redesenho
+
+        cabecalho = tk.Frame(self, bg=COR_FUNDO)
+        cabecalho.pack(fill="x")
+        self._cabecalho = tk.Canvas(cabecalho, height=self.ALTURA_LINHA, bg=COR_FUNDO, highlightthickness=0)
+        self._cabecalho.pack(fill="x")
+        x = 4
+        for titulo, largura in zip(titulos, larguras):
+            self._cabecalho.create_text(x, self.ALTURA_LINHA // 2, text=titulo, anchor="w", fill=COR_CABECALHO,
+                                        font=("Helvetica", 9, "bold"))
+            x += largura
+
+        corpo = tk.Frame(self, bg=COR_FUNDO)
+        corpo.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(corpo, bg=COR_FUNDO, highlightthickness=0, takefocus=1)
+        self.barra = tk.Scrollbar(corpo, orient="vertical", command=self._rolar_barra)
+        self.barra.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda _: self._ajustar_linhas())
+        self.canvas.bind("<Enter>", lambda _: self.canvas.focus_set())
+        self.canvas.bind("<Button-1>", self._clicar)
+        self.canvas.bind("<Shift-Button-1>", lambda evento: self._clicar(evento, estender=True))
+        self.canvas.bind("<MouseWheel>", lambda evento: self.rolar(-1 if evento.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda _: self.rolar(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda _: self.rolar(1, "units"))
+        self.canvas.bind("<Prior>", lambda _: self.rolar(-1, "pages"))
+        self.canvas.bind("<Next>", lambda _: self.rolar(1, "pages"))
+        self.canvas.bind("<Control-a>", lambda _: self.selecionar_tudo())
+
+    # Quantidade de linhas que cabem na área visível
+    def linhas_visiveis(self):
+        return max(1, self.canvas.winfo_height() // self.ALTURA_LINHA)
+
+    def definir_fonte(self, fonte):
+        """Troca a fonte de dados e volta ao topo, limpando a seleção."""
+        self.fonte = fonte
+        self.primeira = 0
+        self.ancora = self.selecao = None
+        self.redesenhar()
+
+    def selecionar_tudo(self):
+        if self.fonte is not None and len(self.fonte):
+            self.ancora, self.selecao = 0, (0, len(self.fonte) - 1)
+            self.redesenhar()
+
+    def linhas_selecionadas(self):
+        """Gera as linhas (tuplas) do intervalo selecionado."""
+        if self.fonte is None or self.selecao is None:
+            return
+        inicio, fim = self.selecao
+        for indice in range(inicio, fim + 1):
+            yield self.fonte.linha(indice)
+
+    def rolar(self, quantidade, unidade="units"):
+        passo = self.linhas_visiveis() if unidade == "pages" else 1
+        self._ir_para(self.primeira + quantidade * passo)
+
+    def _rolar_barra(self, acao, *argumentos):
+        if acao == "moveto":
+            total = len(self.fonte) if self.fonte is not None else 0
+            self._ir_para(int(float(argumentos[0]) * total))
+        elif acao == "scroll":
+            self.rolar(int(argumentos[0]), argumentos[1])
+
+    def _ir_para(self, primeira):
+        total = len(self.fonte) if self.fonte is not None else 0
+        self.primeira = max(0, min(primeira, total - self.linhas_visiveis()))
+        self.redesenhar()
+
+    def _ajustar_linhas(self):
+        """Cria ou remove itens do Canvas para cobrir exatamente a altura visível."""
+        necessarias = self.linhas_visiveis() + 1
+        while len(self._linhas) < necessarias:
+            y = len(self._linhas) * self.ALTURA_LINHA
+            retangulo = self.canvas.create_rectangle(0, y, 10000, y + self.ALTURA_LINHA, width=0, fill=COR_LINHA)
+            textos = []
+            x = 4
+            for largura in self.larguras:
+                textos.append(self.canvas.create_text(x, y + self.ALTURA_LINHA // 2, anchor="w", fill=COR_TEXTO,
+                                                      font=("Helvetica", 9)))
+                x += largura
+            self._linhas.append((retangulo, textos))
+        while len(self._linhas) > necessarias:
+            retangulo, textos = self._linhas.pop()
+            self.canvas.delete(retangulo, *textos)
+        self._ir_para(self.primeira)
+
+    def redesenhar(self):
+        """Atualiza o texto e a cor dos itens visíveis a partir da fonte."""
+        total = len(self.fonte) if self.fonte is not None else 0
+        for posicao, (retangulo, textos) in enumerate(self._linhas):
+            indice = self.primeira + posicao
+            if indice < total:
+                valores = self.fonte.linha(indice)
+                selecionada = self.selecao is not None and self.selecao[0] <= indice <= self.selecao[1]
+                cor = COR_SELECAO if selecionada else (COR_LINHA if indice % 2 == 0 else COR_LINHA_ALTERNADA)
+            else:
+                valores, cor = ("",) * len(textos), COR_FUNDO
+            self.canvas.itemconfigure(retangulo, fill=cor)
+            for texto, valor in zip(textos, valores):
+                self.canvas.itemconfigure(texto, text=valor)
+
+        visiveis = self.linhas_visiveis()
+        if total:
+            self.barra.set(self.primeira / total, min(1.0, (self.primeira + visiveis) / total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def _clicar(self, evento, estender=False):
+        self.canvas.focus_set()
+        if self.fonte is None:
+            return
+        indice = self.primeira + evento.y // self.ALTURA_LINHA
+        if indice >= len(self.fonte):
+            return
+        if estender and self.ancora is not None:
+            self.selecao = (min(self.ancora, indice), max(self.ancora, indice))
+        else:
+            self.ancora, self.selecao = indice, (indice, indice)
+        self.redesenhar()
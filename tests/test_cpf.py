@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+import cpf
+import dados
+
+# CPFs válidos conhecidos (dígitos verificadores conferidos à mão)
+CPFS_VALIDOS = ("52998224725", "11144477735", "00000000000")
+
+
+# Cálculo de referência dos dígitos verificadores, independente do código testado
+def cpf_valido(valor):
+    digitos = [int(d) for d in valor]
+    if len(digitos) != 11:
+        return False
+    for posicao in (9, 10):
+        soma = sum(d * (posicao + 1 - i) for i, d in enumerate(digitos[:posicao]))
+        if (soma * 10) % 11 % 10 != digitos[posicao]:
+            return False
+    return True
+
+
+def test_referencia_aceita_cpfs_conhecidos():
+    assert all(cpf_valido(valor) for valor in CPFS_VALIDOS)
+    assert not cpf_valido("52998224726")
+
+
+def test_gerar_cpf_valido():
+    random.seed(1)
+    for _ in range(500):
+        assert cpf_valido(dados.gerar_cpf_valido())
+
+
+@pytest.mark.parametrize("valor", CPFS_VALIDOS)
+def test_completar_cpf(valor):
+    assert dados.completar_cpf(int(valor[:9])) == valor
+
+
+@pytest.mark.parametrize("n", [1, 63, 64, 1000])
+def test_completar_cpfs_confere_com_completar_cpf(n):
+    # Abaixo de 64 bases usa as tabelas; a partir daí, o NumPy (se instalado)
+    bases = random.Random(n).choices(range(1000000000), k=n)
+    assert dados.completar_cpfs(bases) == [dados.completar_cpf(base) for base in bases]
+
+
+def test_gerar_cpfs_reprodutivel_e_valido():
+    cpfs = dados.gerar_cpfs(2000, random.Random(7))
+    assert cpfs == dados.gerar_cpfs(2000, random.Random(7))
+    assert all(len(valor) == 11 and cpf_valido(valor) for valor in cpfs)
+
+
+def test_validar_cpf_vetorizado():
+    pytest.importorskip("numpy")
+    valores = ["52998224725", "52998224726", "1234567890", "5299822472a", "11144477735"]
+    assert cpf.validar_cpf(valores).tolist() == [True, False, False, False, True]
+    assert cpf.validar_cpf([52998224725, 52998224726]).tolist() == [True, False]
+
+
+def test_motor_vetorizado_gera_cpfs_validos():
+    np = pytest.importorskip("numpy")
+    cpfs = cpf.gerar_cpfs_vetorizado(1000, "bytes", np.random.default_rng(3))
+    assert all(cpf_valido(valor.decode("ascii")) for valor in cpfs.tolist())
+    assert cpf.validar_cpf(cpfs).all()
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+import dados
+import esquema
+
+
+@pytest.fixture(scope="module")
+def vocabulario():
+    return dados.obter_vocabulario()
+
+
+@pytest.mark.parametrize("definicao, mensagem", [
+    ({}, "campos"),
+    ({"campos": []}, "campos"),
+    ({"campos": [{"nome": "x", "tipo": "desconhecido"}]}, "tipo"),
+    ({"campos": [{"tipo": "nome"}]}, "nome"),
+    ({"campos": [{"nome": "x", "tipo": "nome"}, {"nome": "x", "tipo": "cpf"}]}, "repetido"),
+    ({"campos": [{"nome": "x", "tipo": "modelo", "modelo": "{y}"}]}, "depende de 'y'"),
+    ({"campos": [{"nome": "a", "tipo": "modelo", "modelo": "{b}"},
+                 {"nome": "b", "tipo": "modelo", "modelo": "{a}"}]}, "circular"),
+    ({"campos": [{"nome": "x", "tipo": "nome", "oculto": True}]}, "ocultos"),
+    ({"campos": [{"nome": "x", "tipo": "inteiro", "minimo": 5, "maximo": 1}]}, "maximo"),
+    ({"campos": [{"nome": "x", "tipo": "data", "minimo": "ontem"}]}, "AAAA-MM-DD"),
+    ({"campos": [{"nome": "x", "tipo": "padrao", "padrao": "abc"}]}, "#"),
+    ({"campos": [{"nome": "x", "tipo": "escolha", "valores": []}]}, "valores"),
+    ({"campos": [{"nome": "x", "tipo": "escolha", "valores": ["a", "b"], "pesos": [1]}]}, "pesos"),
+    ({"campos": [{"nome": "x", "tipo": "vocabulario", "tabela": "cidades"}]}, "tabela"),
+    ({"campos": [{"nome": "x", "tipo": "inteiro", "tamanho_maximo": 2}]}, "texto"),
+    ({"campos": [{"nome": "x", "tipo": "inteiro", "nulos": 0.5}]}, "texto"),
+    ({"campos": [{"nome": "x", "tipo": "login", "tamanho_maximo": 0}]}, "inteiro positivo"),
+    ({"campos": [{"nome": "x", "tipo": "login", "nulos": 2}]}, "entre 0 e 1"),
+    ({"campos": [{"nome": "x", "tipo": "login", "nulos": "muitos"}]}, "entre 0 e 1"),
+])
+def test_erros_de_compilacao(vocabulario, definicao, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        esquema.compilar(definicao, vocabulario=vocabulario)
+
+
+def test_obter_esquema_inexistente():
+    with pytest.raises(ValueError, match="não encontrado"):
+        esquema.obter_esquema("esquema_que_nao_existe")
+
+
+def test_padrao_igual_a_gerar_usuarios(vocabulario):
+    plano = esquema.compilar(esquema.ESQUEMAS["padrao"], "M", vocabulario)
+    assert plano.colunas == dados.COLUNAS_USUARIO
+    assert plano.gerar(500, random.Random(3)) == dados.gerar_usuarios(500, "M", random.Random(3))
+
+
+def test_dependencias_e_restricoes(vocabulario):
+    definicao = {"campos": [
+        {"nome": "email", "tipo": "modelo", "modelo": "{login}@empresa.com.br", "ascii": True},
+        {"nome": "login", "tipo": "login", "tamanho_maximo": 6, "oculto": True},
+        {"nome": "idade", "tipo": "inteiro", "minimo": 18, "maximo": 20},
+        {"nome": "apelido", "tipo": "escolha", "valores": ["a", "b"], "nulos": 1},
+    ]}
+    lote = esquema.compilar(definicao, vocabulario=vocabulario).gerar(200, random.Random(5))
+    assert list(lote) == ["email", "idade", "apelido"]
+    assert all(len(email.split("@")[0]) <= 6 and email.endswith("@empresa.com.br") for email in lote["email"])
+    assert set(lote["idade"]) <= {18, 19, 20}
+    assert lote["apelido"] == [""] * 200
+
+
+def test_gerar_lotes_reprodutivel(vocabulario):
+    plano = esquema.compilar(esquema.ESQUEMAS["completo"], vocabulario=vocabulario)
+    primeiro = list(plano.gerar_lotes(250, 100, semente=9))
+    assert [len(lote["cpf"]) for lote in primeiro] == [100, 100, 50]
+    assert list(plano.gerar_lotes(250, 100, semente=9)) == primeiro
@@ -0,0 +1,51 @@
+import pytest
+
+import dados
+import indexado
+
+SEMENTE = 42
+TOTAL = 1000
+
+
+# Junta os lotes numa lista de linhas (tuplas na ordem de COLUNAS_USUARIO)
+def linhas(lotes):
+    return [linha for lote in lotes for linha in zip(*(lote[coluna] for coluna in dados.COLUNAS_USUARIO))]
+
+
+@pytest.mark.parametrize("genero", [None, "M", "F"])
+def test_tamanho_do_lote_nao_muda_os_registros(genero):
+    esperado = linhas(indexado.gerar_lotes_indexados(TOTAL, genero, TOTAL, SEMENTE))
+    for tamanho_lote in (1, 7, 64, 333):
+        assert linhas(indexado.gerar_lotes_indexados(TOTAL, genero, tamanho_lote, SEMENTE)) == esperado
+
+
+def test_inicio_retoma_os_mesmos_registros():
+    esperado = linhas(indexado.gerar_lotes_indexados(TOTAL, None, 100, SEMENTE))
+    assert linhas(indexado.gerar_lotes_indexados(TOTAL, None, 100, SEMENTE, inicio=457)) == esperado[457:]
+
+
+def test_usuario_por_indice():
+    esperado = linhas([indexado.gerar_intervalo(SEMENTE, 0, 300)])
+    for i in (0, 1, 63, 64, 299):
+        assert indexado.gerar_usuario_indice(SEMENTE, i) == esperado[i]
+
+
+def test_sementes_diferentes_geram_registros_diferentes():
+    assert linhas([indexado.gerar_intervalo(1, 0, 50)]) != linhas([indexado.gerar_intervalo(2, 0, 50)])
+
+
+def test_hashes_vetorizados_iguais_aos_escalares():
+    if indexado.np is None:
+        pytest.skip("NumPy não instalado")
+    chave = indexado.chaves_campos(SEMENTE)["nome"]
+    assert indexado.hashes(chave, 10, 500, vetorizado=True).tolist() == indexado.hashes(chave, 10, 500)
+
+
+def test_misturar_splitmix64():
+    # Primeiras saídas do SplitMix64 com estado inicial 0 (valores de referência do algoritmo)
+    estado = 0
+    saidas = []
+    for _ in range(3):
+        estado = (estado + indexado._INCREMENTO) & indexado._MASCARA
+        saidas.append(indexado.misturar(estado))
+    assert saidas == [0xE220A8397B1DCDAF, 0x6E789E6AA1B965F4, 0x06C45D188009454F]
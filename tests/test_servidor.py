@@ -0,0 +1,51 @@
+import asyncio
+import http.client
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import cli
+import servidor
+
+SEMENTE = 5
+BLOCO = 100
+
+
+# Sobe o servidor numa porta livre, faz o pedido GET e retorna (status, cabeçalhos, corpo)
+def pedir(alvo):
+    async def executar():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            instancia = await servidor.ServidorUsuarios(executor, BLOCO).iniciar(porta=0)
+            async with instancia:
+                porta = instancia.sockets[0].getsockname()[1]
+                return await asyncio.get_running_loop().run_in_executor(None, _get, porta, alvo)
+
+    return asyncio.run(executar())
+
+
+# Cliente HTTP bloqueante: o http.client já desfaz o Transfer-Encoding chunked
+def _get(porta, alvo):
+    conexao = http.client.HTTPConnection(servidor.HOST_PADRAO, porta, timeout=30)
+    try:
+        conexao.request("GET", alvo)
+        resposta = conexao.getresponse()
+        return resposta.status, dict(resposta.getheaders()), resposta.read()
+    finally:
+        conexao.close()
+
+
+def test_usuarios_igual_ao_jsonl_do_cli(tmp_path):
+    saida = tmp_path / "usuarios.jsonl"
+    argumentos = ["-n", "250", "--seed", str(SEMENTE), "-f", "jsonl", "-o", str(saida), "--chunk-size", str(BLOCO)]
+    assert cli.main(argumentos) == 0
+
+    status, cabecalhos, corpo = pedir(f"/usuarios?n=250&seed={SEMENTE}")
+    assert status == 200
+    assert cabecalhos["Transfer-Encoding"] == "chunked"
+    assert cabecalhos["X-Semente"] == str(SEMENTE)
+    assert corpo == saida.read_bytes()
+
+
+def test_usuario_sem_seed_responde_400():
+    status, _, corpo = pedir("/usuario?i=3")
+    assert status == 400
+    assert json.loads(corpo) == {"erro": "informe seed e i."}
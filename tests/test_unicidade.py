@@ -0,0 +1,67 @@
+import random
+
+import dados
+import unicidade
+
+
+def test_filtro_bloom_sem_falsos_negativos():
+    filtro = unicidade.FiltroBloom(5000)
+    valores = [f"login{i}" for i in range(5000)]
+    assert all(filtro.adicionar(valor) for valor in valores)
+    assert not any(filtro.adicionar(valor) for valor in valores)
+
+
+def test_escalar_login_cabe_em_16_caracteres():
+    assert unicidade.escalar_login("ana12", 1) == "ana1012"
+    login = unicidade.escalar_login("fernandaincrivel999", 42)
+    assert len(login) <= unicidade.TAMANHO_MAXIMO_LOGIN and login.endswith("42999")
+
+
+def test_garantir_unicidade():
+    indice = unicidade.IndiceUnicidade(200)
+    try:
+        lote = dados.gerar_usuarios(100, None, random.Random(1))
+        repetido = {coluna: valores * 2 for coluna, valores in lote.items()}
+        unicidade.garantir_unicidade(repetido, indice, random.Random(2))
+        assert len(set(repetido["cpf"])) == 200 and len(set(repetido["login"])) == 200
+        assert repetido["cpf"][:100] == lote["cpf"] and repetido["login"][:100] == lote["login"]
+        assert all(dados.completar_cpf(int(valor[:9])) == valor for valor in repetido["cpf"])
+        assert indice.cpfs_substituidos == 100 and indice.logins_escalados == 100
+    finally:
+        indice.fechar()
+
+
+def test_aplicar_unicidade_pelo_indice_absoluto_do_lote():
+    # Retomar a partir do lote 2 usa as mesmas sementes de substituição de uma execução completa
+    lotes = [dados.gerar_usuarios(50, None, random.Random(i)) for i in range(4)]
+    duplicados = [{coluna: valores * 2 for coluna, valores in lote.items()} for lote in lotes]
+
+    def aplicar(lotes, primeiro_lote):
+        indice = unicidade.IndiceUnicidade(400)
+        try:
+            copias = [{coluna: list(valores) for coluna, valores in lote.items()} for lote in lotes]
+            return list(unicidade.aplicar_unicidade(copias, indice, 7, primeiro_lote))
+        finally:
+            indice.fechar()
+
+    completos = aplicar(duplicados, 0)
+    retomados = aplicar(duplicados[2:], 2)
+    assert [lote["cpf"][50:] for lote in retomados] != [lote["cpf"][50:] for lote in completos[:2]]
+    assert [lote["cpf"] for lote in retomados] == [lote["cpf"] for lote in completos[2:]]
+
+
+def test_limite_de_tentativas_nao_muda_os_logins(monkeypatch):
+    lote = dados.gerar_usuarios(100, None, random.Random(3))
+
+    def escalar(limite):
+        monkeypatch.setattr(unicidade, "LIMITE_TENTATIVAS", limite)
+        indice = unicidade.IndiceUnicidade(400)
+        try:
+            repetido = {coluna: valores * 4 for coluna, valores in lote.items()}
+            unicidade.garantir_unicidade(repetido, indice, random.Random(4))
+            assert len(indice.proxima_tentativa) <= limite
+            return repetido["login"]
+        finally:
+            indice.fechar()
+
+    assert escalar(2) == escalar(unicidade.LIMITE_TENTATIVAS)
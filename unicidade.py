@@ -0,0 +1,191 @@
+import os
+import math
+import mmap
+import random
+import hashlib
+import logging
+
+from dados import completar_cpf, derivar_semente
+
+# Quantidade de bases possíveis de CPF (9 dígitos antes dos verificadores)
+TOTAL_BASES_CPF = 1000000000
+# Tamanho máximo do login, o mesmo usado por gerar_login
+TAMANHO_MAXIMO_LOGIN = 16
+# Folga do filtro de logins sobre a capacidade pedida (logins já gravados ao retomar, escalonamentos)
+FOLGA_FILTRO_LOGINS = 1.5
+# Máximo de logins com a próxima tentativa guardada (~15 MB); ao atingir, o cache recomeça vazio
+LIMITE_TENTATIVAS = 100000
+
+# Classe com um bit por base de CPF, opcionalmente persistida em arquivo
+class BitsetCPF:
+    """Bitset de 10^9 bits (125 MB) mapeado em memória que registra as bases de CPF já usadas.
+
+    Com `caminho`, o arquivo é criado (esparso) ou reaberto, e os CPFs marcados persistem
+    entre execuções; sem ele, usa um mapeamento anônimo descartado ao fechar.
+    """
+
+    TAMANHO_BYTES = TOTAL_BASES_CPF // 8
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self._arquivo = None
+        if caminho is None:
+            self._mapa = mmap.mmap(-1, self.TAMANHO_BYTES)
+            return
+
+        modo = "r+b" if os.path.exists(caminho) else "w+b"
+        self._arquivo = open(caminho, modo)
+        if os.fstat(self._arquivo.fileno()).st_size != self.TAMANHO_BYTES:
+            self._arquivo.truncate(self.TAMANHO_BYTES)
+        self._mapa = mmap.mmap(self._arquivo.fileno(), self.TAMANHO_BYTES)
+
+    def adicionar(self, base):
+        """Marca a base e retorna True se ela ainda não tinha sido usada."""
+        posicao, bit = base >> 3, 1 << (base & 7)
+        atual = self._mapa[posicao]
+        if atual & bit:
+            return False
+        self._mapa[posicao] = atual | bit
+        return True
+
+    def __contains__(self, base):
+        return bool(self._mapa[base >> 3] & (1 << (base & 7)))
+
+    def fechar(self):
+        """Grava as alterações (se houver arquivo) e libera o mapeamento."""
+        if self._arquivo is not None:
+            self._mapa.flush()
+        self._mapa.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+# Classe com o filtro de Bloom usado para os logins
+class FiltroBloom:
+    """Filtro de Bloom de tamanho fixo, calculado a partir da capacidade e da taxa de falsos positivos.
+
+    Nunca tem falsos negativos: um falso positivo apenas faz o login ser escalado sem necessidade.
+    """
+
+    def __init__(self, capacidade, taxa_falsos_positivos=1e-4):
+        capacidade = max(int(capacidade), 1)
+        self.total_bits = max(64, math.ceil(-capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        self.total_hashes = max(1, round(self.total_bits / capacidade * math.log(2)))
+        self._bits = bytearray((self.total_bits + 7) // 8)
+
+    def adicionar(self, valor):
+        """Insere o valor e retorna True se ele certamente ainda não estava no filtro."""
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits, total_bits = self._bits, self.total_bits
+        novo = False
+        for i in range(self.total_hashes):
+            posicao = (h1 + i * h2) % total_bits
+            byte, mascara = posicao >> 3, 1 << (posicao & 7)
+            if not bits[byte] & mascara:
+                bits[byte] |= mascara
+                novo = True
+        return novo
+
+    @property
+    def tamanho_bytes(self):
+        return len(self._bits)
+
+# Função para obter a base (9 primeiros dígitos) de um CPF, com ou sem pontuação
+def base_cpf(valor):
+    """Aceita "12345678909" ou "123.456.789-09"."""
+    return int(valor[:9]) if len(valor) == 11 else int(valor[:11].replace(".", ""))
+
+# Função para escalar um login repetido de forma determinística
+def escalar_login(login, tentativa):
+    """Retorna a `tentativa`-ésima variação do login: sufixo numérico + 1000 * tentativa.
+
+    O prefixo (nome + adjetivo) é encurtado para que o sufixo sempre caiba em 16 caracteres.
+    """
+    prefixo = login.rstrip("0123456789")
+    numero = int(login[len(prefixo):] or 0)
+    sufixo = str(numero + 1000 * tentativa)
+    return prefixo[:TAMANHO_MAXIMO_LOGIN - len(sufixo)] + sufixo
+
+# Classe que garante CPFs e logins únicos numa execução
+class IndiceUnicidade:
+    """Agrupa o bitset de CPFs e o filtro de logins usados por garantir_unicidade.
+
+    O filtro é dimensionado para `capacidade` * FOLGA_FILTRO_LOGINS logins, então a taxa de
+    falsos positivos fica abaixo da pedida mesmo com os logins já gravados ao retomar.
+    Só logins aceitos entram no filtro: uma tentativa recusada não marca bits.
+    """
+
+    def __init__(self, capacidade, caminho_cpfs=None, taxa_falsos_positivos=1e-4):
+        self.cpfs = BitsetCPF(caminho_cpfs)
+        self.logins = FiltroBloom(math.ceil(capacidade * FOLGA_FILTRO_LOGINS), taxa_falsos_positivos)
+        self.cpfs_substituidos = 0
+        self.logins_escalados = 0
+        # Próxima tentativa de escalonamento por login, para não repetir tentativas já usadas
+        # (só um atalho, limitado a LIMITE_TENTATIVAS logins)
+        self.proxima_tentativa = {}
+
+    def registrar_existentes(self, pares):
+        """Marca como usados os pares (cpf, login) já gravados, ex.: ao retomar uma exportação."""
+        for valor_cpf, login in pares:
+            self.cpfs.adicionar(base_cpf(valor_cpf))
+            self.logins.adicionar(login)
+
+    def fechar(self):
+        self.cpfs.fechar()
+        logging.info(
+            f"Unicidade: {self.cpfs_substituidos} CPFs substituídos, {self.logins_escalados} logins escalados "
+            f"(filtro de logins com {self.logins.tamanho_bytes / 2 ** 20:.1f} MB)."
+        )
+
+# Função para tornar únicos os CPFs e logins de um lote
+def garantir_unicidade(lote, indice, rng=None):
+    """Substitui, in-place, CPFs e logins já usados nesta execução (ou, para CPFs, no arquivo do índice).
+
+    CPFs repetidos são trocados por novas bases sorteadas com `rng`; logins repetidos são
+    escalados com escalar_login até obter um valor inédito, começando pela próxima tentativa
+    ainda não usada para o mesmo login (o custo por registro não cresce com o total). Todas as
+    tentativas anteriores a essa já estão no filtro, então o login escolhido é o primeiro livre,
+    o mesmo de uma execução retomada (que começa da tentativa 1). Pelo mesmo motivo, o cache
+    de tentativas pode ser esvaziado ao chegar a LIMITE_TENTATIVAS logins sem mudar a saída:
+    a memória fica limitada e só os logins muito repetidos voltam a percorrer as tentativas.
+    """
+    rng = rng if rng is not None else random
+    cpfs, logins = lote["cpf"], lote["login"]
+    adicionar_cpf, adicionar_login = indice.cpfs.adicionar, indice.logins.adicionar
+
+    for posicao, valor in enumerate(cpfs):
+        if not adicionar_cpf(base_cpf(valor)):
+            base = rng.randrange(TOTAL_BASES_CPF)
+            while not adicionar_cpf(base):
+                base = rng.randrange(TOTAL_BASES_CPF)
+            novo = completar_cpf(base)
+            # Mantém o formato do CPF substituído (ex.: esquemas com o CPF pontuado)
+            cpfs[posicao] = novo if len(valor) == 11 else f"{novo[:3]}.{novo[3:6]}.{novo[6:9]}-{novo[9:]}"
+            indice.cpfs_substituidos += 1
+
+    proxima_tentativa = indice.proxima_tentativa
+    for posicao, login in enumerate(logins):
+        if adicionar_login(login):
+            continue
+        tentativa = proxima_tentativa.get(login, 1)
+        while not adicionar_login(escalar_login(login, tentativa)):
+            tentativa += 1
+        if len(proxima_tentativa) >= LIMITE_TENTATIVAS:
+            proxima_tentativa.clear()
+        proxima_tentativa[login] = tentativa + 1
+        logins[posicao] = escalar_login(login, tentativa)
+        indice.logins_escalados += 1
+    return lote
+
+# Função para aplicar a unicidade a uma sequência de lotes
+def aplicar_unicidade(lotes, indice, semente=None, primeiro_lote=0):
+    """Gera os lotes com CPFs e logins únicos, processando-os em ordem no processo atual.
+
+    Com `semente`, as substituições de cada lote usam uma semente derivada do seu índice
+    absoluto (o primeiro lote recebido é o `primeiro_lote`, ex.: inicio // tamanho_lote ao
+    retomar), então a saída continua reprodutível (inclusive com geração paralela).
+    """
+    for numero, lote in enumerate(lotes, primeiro_lote):
+        rng = random.Random(derivar_semente(semente, f"unicidade:{numero}")) if semente is not None else None
+        yield garantir_unicidade(lote, indice, rng)
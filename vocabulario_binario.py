@@ -0,0 +1,249 @@
+import os
+import json
+import mmap
+import struct
+import logging
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+
+import amostragem
+
+# Assinatura e versão do formato do arquivo
+MAGICA = b"GDVOCAB\x00"
+VERSAO_ARQUIVO_VOCABULARIO = 1
+# Alinhamento (em bytes) do início de cada seção, para as visões de inteiros e reais
+_ALINHAMENTO = 8
+# Conjuntos de texto gravados; "primeiros" é alinhado a "nomes" (primeiro nome em minúsculas, para os logins)
+CONJUNTOS_TEXTO = ("nomes", "primeiros", "sobrenomes", "adjetivos", "ddds")
+# Tabelas de alias gravadas (as mesmas chaves de Vocabulario.tabelas)
+CHAVES_ALIAS = ("M", "F", "N", "sobrenomes", "adjetivos", "ddds")
+# Terminador de cada texto no buffer UTF-8
+_SEPARADOR = "\x00"
+# Textos decodificados guardados por conjunto (o cache é esvaziado ao passar disso)
+LIMITE_CACHE_TEXTOS = 65536
+
+# Função para obter o caminho do vocabulário binário de um banco
+def caminho_arquivo_vocabulario(db_path):
+    """Retorna o caminho do arquivo ao lado do banco (ex.: nomes.vocab)."""
+    return os.path.splitext(db_path)[0] + ".vocab"
+
+# Função para identificar o conteúdo do banco sem abri-lo no SQLite
+def impressao_banco(db_path):
+    """Retorna [tamanho, contador de alterações, páginas, cookie do esquema] do cabeçalho SQLite.
+
+    Só lê os 100 bytes do cabeçalho: não depende do tamanho do banco e continua a mesma quando
+    o arquivo é copiado (o mtime muda, o conteúdo não). Retorna None se o arquivo não for um
+    banco SQLite ou tiver um WAL pendente (alterações que o cabeçalho ainda não mostra).
+    """
+    try:
+        tamanho = os.path.getsize(db_path)
+        with open(db_path, "rb") as arquivo:
+            cabecalho = arquivo.read(100)
+        if os.path.exists(db_path + "-wal") and os.path.getsize(db_path + "-wal") > 0:
+            return None
+    except OSError:
+        return None
+    if len(cabecalho) < 100 or not cabecalho.startswith(b"SQLite format 3\x00"):
+        return None
+    contador, paginas = struct.unpack(">II", cabecalho[24:32])
+    cookie, = struct.unpack(">I", cabecalho[40:44])
+    return [tamanho, contador, paginas, cookie]
+
+# Função para codificar um conjunto de textos: buffer UTF-8 e deslocamentos
+def _codificar_textos(valores):
+    codificados = []
+    for valor in valores:
+        if _SEPARADOR in valor:
+            raise ValueError(f"Texto com caractere nulo no vocabulário: {valor!r}")
+        codificados.append(valor.encode("utf-8") + b"\x00")
+    deslocamentos = array("Q", accumulate((len(c) for c in codificados), initial=0))
+    return b"".join(codificados), deslocamentos
+
+# Função para localizar os nomes de um gênero dentro da lista de todos os nomes
+def _indices_subsequencia(todos, parte):
+    """Retorna as posições em `todos` de `parte`, que é uma subsequência (na mesma ordem) de `todos`."""
+    indices = array("I")
+    j = 0
+    for i, valor in enumerate(todos):
+        if j < len(parte) and valor == parte[j]:
+            indices.append(i)
+            j += 1
+    if j != len(parte):
+        raise ValueError("Os nomes do gênero não estão na ordem da lista completa de nomes.")
+    return indices
+
+# Função para gravar o vocabulário binário
+def escrever(caminho, vocabulario, impressao):
+    """Grava o vocabulário em `caminho` e retorna o caminho.
+
+    Formato: MAGICA, tamanho (uint32) e descrição em JSON (versão, impressão do banco de
+    origem e {seção: [deslocamento, tamanho]}), seguidos das seções alinhadas a 8 bytes. Cada
+    conjunto de texto é um buffer UTF-8 (textos terminados em \\0) com um array uint64 de
+    deslocamentos; os nomes de cada gênero são um array uint32 de posições em "nomes"; cada
+    tabela de alias são as probabilidades (float64) e os aliases (uint32).
+    """
+    secoes = {}
+    valores = {
+        "nomes": vocabulario.nomes_todos,
+        "primeiros": vocabulario.primeiros_nomes(None),
+        "sobrenomes": vocabulario.sobrenomes,
+        "adjetivos": vocabulario.adjetivos,
+        "ddds": vocabulario.ddds,
+    }
+    for conjunto in CONJUNTOS_TEXTO:
+        secoes[f"{conjunto}.texto"], secoes[f"{conjunto}.deslocamentos"] = _codificar_textos(valores[conjunto])
+    secoes["M.indices"] = _indices_subsequencia(vocabulario.nomes_todos, vocabulario.nomes_masculinos)
+    secoes["F.indices"] = _indices_subsequencia(vocabulario.nomes_todos, vocabulario.nomes_femininos)
+    uniformes = {}
+    for chave in CHAVES_ALIAS:
+        tabela = vocabulario.tabela(chave)
+        secoes[f"{chave}.probabilidades"] = array("d", tabela.probabilidades)
+        secoes[f"{chave}.aliases"] = array("I", tabela.aliases)
+        uniformes[chave] = tabela.uniforme
+
+    posicoes, conteudos, posicao = {}, [], 0
+    for nome, conteudo in secoes.items():
+        dados_secao = conteudo if isinstance(conteudo, bytes) else conteudo.tobytes()
+        posicoes[nome] = [posicao, len(dados_secao)]
+        preenchimento = -len(dados_secao) % _ALINHAMENTO
+        conteudos.append(dados_secao + b"\x00" * preenchimento)
+        posicao += len(dados_secao) + preenchimento
+    descricao = json.dumps({
+        "versao": VERSAO_ARQUIVO_VOCABULARIO,
+        "impressao": impressao,
+        "secoes": posicoes,
+        "uniformes": uniformes,
+    }).encode("utf-8")
+    cabecalho = MAGICA + struct.pack("<I", len(descricao)) + descricao
+    cabecalho += b"\x00" * (-len(cabecalho) % _ALINHAMENTO)
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(cabecalho)
+        for conteudo in conteudos:
+            arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+    return caminho
+
+# Classe com o vocabulário binário mapeado em memória
+class VocabularioBinario:
+    """Acesso sem cópia às seções do arquivo: o mapeamento é somente leitura e as páginas são
+    compartilhadas pelo sistema entre todos os processos que abrem o mesmo arquivo.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapa[:len(MAGICA)] != MAGICA:
+            raise ValueError("não é um vocabulário binário")
+        tamanho, = struct.unpack_from("<I", self._mapa, len(MAGICA))
+        inicio_descricao = len(MAGICA) + 4
+        self.descricao = json.loads(self._mapa[inicio_descricao:inicio_descricao + tamanho])
+        self._inicio = inicio_descricao + tamanho + (-(inicio_descricao + tamanho) % _ALINHAMENTO)
+        self._visao = memoryview(self._mapa)
+
+    def secao(self, nome, formato="B"):
+        """Retorna a seção como memoryview (formato "B", "I", "Q" ou "d"), sem copiar."""
+        deslocamento, tamanho = self.descricao["secoes"][nome]
+        inicio = self._inicio + deslocamento
+        return self._visao[inicio:inicio + tamanho].cast(formato)
+
+    def quantidade(self, conjunto):
+        return len(self.secao(f"{conjunto}.deslocamentos", "Q")) - 1
+
+    def texto(self, conjunto, indice):
+        """Decodifica só o texto `indice` do conjunto."""
+        deslocamentos = self.secao(f"{conjunto}.deslocamentos", "Q")
+        return str(self.secao(f"{conjunto}.texto")[deslocamentos[indice]:deslocamentos[indice + 1] - 1], "utf-8")
+
+    def sequencia(self, conjunto, indices=None):
+        """Retorna o conjunto como TextosMapeados (`indices`: seção uint32 de posições, ex.: "M.indices")."""
+        return TextosMapeados(self, conjunto, self.secao(indices, "I") if indices else None)
+
+    def tabela_alias(self, chave):
+        """Retorna a TabelaAlias da chave sobre as seções mapeadas (sem construir nem copiar)."""
+        return amostragem.TabelaAlias(
+            self.secao(f"{chave}.probabilidades", "d"),
+            self.secao(f"{chave}.aliases", "I"),
+            uniforme=self.descricao["uniformes"][chave],
+        )
+
+# Classe que expõe um conjunto de texto do arquivo como sequência, sem decodificá-lo inteiro
+class TextosMapeados(Sequence):
+    """Sequência (len, índice, iteração) dos textos de um conjunto, lidos do mapeamento.
+
+    len() e o teste de vazio vêm dos deslocamentos; cada texto só é decodificado quando
+    pedido e fica num cache de até LIMITE_CACHE_TEXTOS entradas, então o processo não guarda
+    uma cópia do vocabulário. Com `indices`, a posição i é o texto indices[i] do conjunto
+    (os nomes de um gênero dentro de "nomes").
+    """
+
+    def __init__(self, binario, conjunto, indices=None):
+        self._texto = binario.secao(f"{conjunto}.texto")
+        self._deslocamentos = binario.secao(f"{conjunto}.deslocamentos", "Q")
+        self._indices = indices
+        self._cache = {}
+
+    def __len__(self):
+        if self._indices is not None:
+            return len(self._indices)
+        return len(self._deslocamentos) - 1
+
+    def _decodificar(self, indice):
+        if self._indices is not None:
+            indice = self._indices[indice]
+        return str(self._texto[self._deslocamentos[indice]:self._deslocamentos[indice + 1] - 1], "utf-8")
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fora do conjunto")
+        valor = self._cache.get(indice)
+        if valor is None:
+            if len(self._cache) >= LIMITE_CACHE_TEXTOS:
+                self._cache.clear()
+            valor = self._cache[indice] = self._decodificar(indice)
+        return valor
+
+    def selecionar(self, indices):
+        """Retorna a lista dos textos nas posições `indices` (decodifica só os que faltam no cache).
+
+        O resultado sai de um dicionário local: outra thread pode limpar o cache compartilhado
+        a qualquer momento sem afetar esta chamada.
+        """
+        cache = self._cache
+        valores = {}
+        for indice in set(indices):
+            valor = cache.get(indice)
+            valores[indice] = valor if valor is not None else self._decodificar(indice)
+        if len(cache) + len(valores) > LIMITE_CACHE_TEXTOS:
+            cache.clear()
+        if len(valores) <= LIMITE_CACHE_TEXTOS:
+            cache.update(valores)
+        return list(map(valores.__getitem__, indices))
+
+# Função para abrir o vocabulário binário de um banco, se estiver atualizado
+def abrir(db_path):
+    """Retorna o VocabularioBinario de `db_path`, ou None se não existir, for de outra versão
+    ou tiver sido gerado de um conteúdo diferente do banco atual.
+    """
+    caminho = caminho_arquivo_vocabulario(db_path)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        binario = VocabularioBinario(caminho)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Vocabulário binário ignorado ({caminho}): {e}")
+        return None
+    if binario.descricao.get("versao") != VERSAO_ARQUIVO_VOCABULARIO:
+        return None
+    impressao = impressao_banco(db_path)
+    if impressao is None or binario.descricao.get("impressao") != impressao:
+        logging.info(f"Vocabulário binário desatualizado ({caminho}); usando o banco SQLite.")
+        return None
+    return binario